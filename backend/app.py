@@ -2,25 +2,28 @@
 Main Flask Application - API for the trading bot
 """
 
+import hashlib
 import json
+import threading
 import traceback
+from collections import OrderedDict
 from flask import Flask, request, jsonify, send_from_directory
+from flask.json.provider import JSONProvider
+from flask_compress import Compress
 from flask_cors import CORS
 import logging
 import os
 from datetime import datetime
 
+import orjson
 import pandas as pd
 
-from backend.strategies.DCA_strategy import DCA_strategy
-from backend.strategies.RSI_strategy import RSIStrategy
-from backend.strategies.buy_and_hold import BuyAndHoldStrategy
-from backend.strategies.EMA_RSI_Vol_Strategy import EMACrossoverRSIVolumeStrategy
-
 from .data.data_manager import DataManager
+from .utils.helpers import serialize_for_json, convert_timeframe_to_minutes
 
 from .backtest.performance_metrics import PerformanceMetrics
-from .backtest.backtest_engine import BacktestEngine
+from .backtest.backtest_engine import BacktestEngine, STRATEGY_MAP
+from .backtest.market_bundle import MarketBundle
 
 
 # Logging configuration
@@ -30,40 +33,199 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Number of market windows kept by the /api/backtest data cache
+MARKET_WINDOW_CACHE_SIZE = 64
+
+
+def _load_config() -> dict:
+    """Load config.json once, with each strategy's parameter definitions attached"""
+    config_path = os.path.join(os.path.dirname(__file__), 'config.json')
+    if not os.path.exists(config_path):
+        logger.warning("Configuration file not found at %s. Using default settings.", config_path)
+        return {}
+
+    with open(config_path, 'r') as f:
+        config = json.load(f)
+
+    strategies = []
+    for strategy in config.get('strategies', []):
+        # Add parameters and risk parameters if they exist
+        strategy_cls = STRATEGY_MAP[strategy['class']]
+        strategies.append({
+            **strategy,
+            'parameters': getattr(strategy_cls, 'parameters', []),
+            'risk_parameters': getattr(strategy_cls, 'risk_parameters', [])
+        })
+    config['strategies'] = strategies
+    return config
+
+
+# Parsed once at import (shared by every app instance, and by forked workers with --preload)
+_CONFIG = _load_config()
+
+# Config payloads only change with config.json, so one ETag covers the /api/config/* routes
+_CONFIG_ETAG = hashlib.md5(orjson.dumps(_CONFIG, option=orjson.OPT_SORT_KEYS)).hexdigest()
+
+
+def _orjson_default(obj):
+    """Fallback for types orjson does not encode natively (pandas Timestamp, DataFrame, ...)"""
+    value = serialize_for_json(obj)
+    if value is obj:
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    return value
+
+
+def _parse_date(value, default: pd.Timestamp) -> pd.Timestamp:
+    """Parse a request date once into a naive UTC Timestamp, raising ValueError if invalid"""
+    if value is None or value == '':
+        return default
+    ts = pd.Timestamp(value)
+    if pd.isna(ts):
+        raise ValueError(f"Invalid date: {value!r}")
+    return ts.tz_convert(None) if ts.tz is not None else ts
+
+
+class ORJSONProvider(JSONProvider):
+    """JSON provider backed by orjson, with native NumPy array and scalar encoding"""
+
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=_orjson_default, option=self.options).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        body = orjson.dumps(obj, default=_orjson_default, option=self.options)
+        return self._app.response_class(body, mimetype='application/json')
+
+    def iter_object(self, obj: dict, stream_keys=()):
+        """Yield a JSON object in chunks, one top-level field at a time.
+
+        Dict values under ``stream_keys`` are themselves emitted one entry per chunk.
+        """
+        def encode(value) -> bytes:
+            return orjson.dumps(value, default=_orjson_default, option=self.options)
+
+        yield b'{'
+        for i, (key, value) in enumerate(obj.items()):
+            prefix = (b',' if i else b'') + encode(key) + b':'
+            if key in stream_keys and isinstance(value, dict):
+                yield prefix + b'{'
+                for j, (sub_key, sub_value) in enumerate(value.items()):
+                    yield (b',' if j else b'') + encode(sub_key) + b':' + encode(sub_value)
+                yield b'}'
+            else:
+                yield prefix + encode(value)
+        yield b'}'
+
+
 def create_app():
     """Factory to create the Flask application"""
     FRONTEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'frontend'))
     app = Flask(__name__, static_folder=None)
+    app.json = ORJSONProvider(app)
     
     # CORS configuration to allow requests from the frontend
     CORS(app)
     
     # Application configuration
-    app.config['DEBUG'] = True
+    # Debug mode (reloader, tracebacks in error responses) is for local development only
+    app.config['DEBUG'] = os.getenv('ENVIRONMENT', 'development') != 'production'
     app.config['TESTING'] = False
     
+    # Compress JSON payloads (OHLCV columns compress very well); fast levels, brotli preferred
+    app.config['COMPRESS_MIMETYPES'] = ['application/json']
+    app.config['COMPRESS_LEVEL'] = 4
+    app.config['COMPRESS_BR_LEVEL'] = 4
+    app.config['COMPRESS_ALGORITHM'] = ['br', 'gzip']
+    app.config['COMPRESS_ALGORITHM_STREAMING'] = ['br', 'deflate']
+    Compress(app)
+    
     data_manager = DataManager()
-    backtest_engine = BacktestEngine()
+    engine_local = threading.local()  # one BacktestEngine per worker thread, reset per request
     live_engine = None  # Placeholder for live trading engine if needed
+
+    def get_backtest_engine() -> BacktestEngine:
+        """Return this thread's backtest engine (concurrent requests never share one)"""
+        engine = getattr(engine_local, 'engine', None)
+        if engine is None:
+            engine = engine_local.engine = BacktestEngine()
+        return engine
+
+    def conditional_json(etag: str, build_payload):
+        """Answer 304 if the client already holds this ETag, else serialize build_payload()"""
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            response = jsonify(build_payload())
+        response.set_etag(etag)
+        return response
+
+    # Market windows that lie entirely in the past (their bars no longer change), most recently used last
+    market_window_cache: 'OrderedDict[tuple, tuple]' = OrderedDict()
+    market_window_lock = threading.Lock()
+
+    def fetch_market_window(symbol: str, timeframe: str, start_ts: pd.Timestamp, end_ts: pd.Timestamp):
+        """Fetch a symbol window indexed by timestamp, with its serialized response payload"""
+        symbol_data = data_manager.get_historical_data(
+            symbol=symbol,
+            start_date=start_ts,
+            end_date=end_ts,
+            timeframe=timeframe
+        )
+        if symbol_data.empty:
+            return symbol_data, {}
+
+        # Set timestamp as index
+        symbol_data = symbol_data.set_index('timestamp', drop=True)
+
+        # Response payload (NumPy columns are encoded directly by the orjson provider); it is shared
+        # between requests through the cache, so the arrays are read-only and the timestamps a tuple
+        columns = {}
+        for column in ('open', 'high', 'low', 'close', 'volume'):
+            if column in symbol_data.columns:
+                values = symbol_data[column].to_numpy()
+                values.setflags(write=False)
+                columns[column] = values
+        payload = {
+            'timestamps': tuple(symbol_data.index.strftime('%Y-%m-%d %H:%M:%S')),
+            **columns,
+        }
+        payload.setdefault('volume', [])
+        return symbol_data, payload
+
+    def load_market_window(symbol: str, timeframe: str, start_ts: pd.Timestamp, end_ts: pd.Timestamp):
+        """Market window of fetch_market_window, from the cache when possible
+
+        Returns (data, payload, cache hit). Empty fetches and windows whose last bar
+        may still be open or in the future are not cached. Each call gets its own
+        copy of the data, so a caller modifying it never alters the cached window.
+        """
+        key = (symbol, timeframe, start_ts.isoformat(), end_ts.isoformat())
+        with market_window_lock:
+            entry = market_window_cache.get(key)
+            if entry is not None:
+                market_window_cache.move_to_end(key)
+        hit = entry is not None
+        if not hit:
+            entry = fetch_market_window(symbol, timeframe, start_ts, end_ts)
+            bar = pd.Timedelta(minutes=convert_timeframe_to_minutes(timeframe))
+            if not entry[0].empty and end_ts + bar <= pd.Timestamp(datetime.now()):
+                with market_window_lock:
+                    market_window_cache[key] = entry
+                    if len(market_window_cache) > MARKET_WINDOW_CACHE_SIZE:
+                        market_window_cache.popitem(last=False)
+        symbol_data, payload = entry
+        return symbol_data.copy(), payload, hit
     
-    config_path = os.path.join(os.path.dirname(__file__), 'config.json')
-    if not os.path.exists(config_path):
-        logger.warning(f"Configuration file not found at {config_path}. Using default settings.")
-        # Default configuration can be set here if needed
-    else:
-        with open(config_path, 'r') as f:
-            config = json.load(f)
-        app.config['SUPPORTED_SYMBOLS'] = config.get('trading_pairs', [])
-        app.config['SUPPORTED_TIMEFRAMES'] = config.get('timeframes', [])
-        app.config['DEFAULT_SETTINGS'] = config.get('default_parameters', {})
-
-        strategies = config.get('strategies', [])
-        for strategy in strategies:
-            # Add parameters and risk parameters if they exist
-            strategy['parameters'] = getattr(globals()[strategy['class']], 'parameters', [])
-            strategy['risk_parameters'] = getattr(globals()[strategy['class']], 'risk_parameters', [])
-        
-        app.config['SUPPORTED_STRATEGIES'] = strategies
+    if _CONFIG:
+        app.config['SUPPORTED_SYMBOLS'] = _CONFIG.get('trading_pairs', [])
+        app.config['SUPPORTED_TIMEFRAMES'] = _CONFIG.get('timeframes', [])
+        app.config['DEFAULT_SETTINGS'] = _CONFIG.get('default_parameters', {})
+        app.config['SUPPORTED_STRATEGIES'] = _CONFIG.get('strategies', [])
 
     # Route to serve index.html
     @app.route("/")
@@ -95,8 +257,15 @@ def create_app():
             # Request parameters
             symbol = request.args.get('symbol', 'BTCUSDC')
             timeframe = request.args.get('timeframe', '1h')
-            start_ts = request.args.get('start_date')
-            end_ts = request.args.get('end_date')
+            
+            # Parse dates up front so invalid ones never reach the data manager
+            try:
+                now = pd.Timestamp(datetime.now())
+                start_ts = _parse_date(request.args.get('start_date'), now - pd.Timedelta(days=90))
+                end_ts = _parse_date(request.args.get('end_date'), now)
+            except (ValueError, TypeError) as e:
+                logger.error("Error parsing dates: %s", e)
+                return jsonify({'error': 'Invalid date format'}), 400
             
             # Fetch data
             data = data_manager.get_historical_data(
@@ -109,25 +278,33 @@ def create_app():
             if data.empty:
                 return jsonify({'error': 'No data available'}), 404
             
-            # Convert for API
-            data_dict = data.to_dict('records')
-            
-            # Format timestamps
-            for record in data_dict:
-                if isinstance(record['timestamp'], pd.Timestamp):
-                    record['timestamp'] = record['timestamp'].isoformat()
+            def build_payload():
+                # Convert for API (one array per column, timestamps as ISO strings)
+                data_dict = {}
+                for column in data.columns:
+                    values = data[column].to_numpy()
+                    if column == 'timestamp':
+                        data_dict[column] = values.astype('datetime64[s]').astype(str).tolist()
+                    else:
+                        data_dict[column] = values
+                
+                return {
+                    'symbol': symbol,
+                    'timeframe': timeframe,
+                    'start_date': start_ts.isoformat(),
+                    'end_date': end_ts.isoformat(),
+                    'data_points': len(data),
+                    'columns': list(data.columns),
+                    'data': data_dict
+                }
             
-            return jsonify({
-                'symbol': symbol,
-                'timeframe': timeframe,
-                'start_date': start_ts,
-                'end_date': end_ts,
-                'data_points': len(data_dict),
-                'data': data_dict
-            })
+            # The window's content only changes when its bars do (new last bar or filled gaps)
+            etag_source = (f"{symbol}|{timeframe}|{start_ts.isoformat()}|{end_ts.isoformat()}|"
+                           f"{data['timestamp'].iloc[-1].isoformat()}|{len(data)}")
+            return conditional_json(hashlib.md5(etag_source.encode()).hexdigest(), build_payload)
             
         except Exception as e:
-            logger.error(f"Error fetching data: {str(e)}")
+            logger.error("Error fetching data: %s", e)
             return jsonify({'error': 'Error fetching market data'}), 500
     
     @app.route('/api/backtest', methods=['POST'])
@@ -140,52 +317,45 @@ def create_app():
             if not request_json:
                 return jsonify({'error': 'JSON data required'}), 400
             
-            logger.info(f"Parameters received for backtest: {request_json}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Parameters received for backtest: %s", request_json)
                 
             # Get historical data
             symbols = request_json.get('symbols', ['BTCUSDT'])
             timeframe = request_json.get('timeframe', '1h')
             
-            # Handle date parameters more robustly
+            # Parse dates up front so invalid ones never reach the data manager
             try:
-                if 'start_date' in request_json:
-                    start_ts = pd.Timestamp(request_json['start_date'])
-                else:
-                    start_ts = pd.Timestamp(datetime.now() - pd.Timedelta(days=90))
-                    
-                if 'end_date' in request_json:
-                    end_ts = pd.Timestamp(request_json['end_date'])
-                else:
-                    end_ts = pd.Timestamp(datetime.now())
-            except Exception as e:
-                logger.error(f"Error parsing dates: {e}")
+                now = pd.Timestamp(datetime.now())
+                start_ts = _parse_date(request_json.get('start_date'), now - pd.Timedelta(days=90))
+                end_ts = _parse_date(request_json.get('end_date'), now)
+            except (ValueError, TypeError) as e:
+                logger.error("Error parsing dates: %s", e)
                 return jsonify({'error': 'Invalid date format'}), 400
 
-            # Fetch market data for all symbols
+            # Fetch market data for all symbols (cached per symbol/timeframe/window)
             market_data = {}
+            market_data_response = {}
+            cache_hits = 0
             for symbol in symbols:
                 try:
-                    symbol_data = data_manager.get_historical_data(
-                        symbol=symbol,
-                        start_date=start_ts,
-                        end_date=end_ts,
-                        timeframe=timeframe
-                    )
+                    symbol_data, symbol_payload, hit = load_market_window(symbol, timeframe, start_ts, end_ts)
+                    cache_hits += hit
                     if symbol_data.empty:
                         return jsonify({'error': f'No market data available for {symbol}'}), 500
                     
-                    # Set timestamp as index
-                    symbol_data = symbol_data.set_index('timestamp', drop=True)
                     market_data[symbol] = symbol_data
+                    market_data_response[symbol] = symbol_payload
                     
                 except Exception as e:
-                    logger.error(f"Error fetching data for {symbol}: {e}")
+                    logger.error("Error fetching data for %s: %s", symbol, e)
                     return jsonify({'error': f'Unable to fetch market data for {symbol}'}), 500
 
             strategy_name = request_json.get('strategy', 'buy_and_hold')
-            logger.info(f"🚀 Starting backtest: {strategy_name} on {symbols}")
+            logger.info("🚀 Starting backtest: %s on %s", strategy_name, symbols)
 
-            # Create backtest engine
+            # Reset this thread's backtest engine for the request
+            backtest_engine = get_backtest_engine()
             backtest_engine.set_parameters(
                 initial_capital=float(request_json.get('initial_capital', 10000)),
                 commission_rate=float(request_json.get('commission_rate', 0.001)),
@@ -198,74 +368,51 @@ def create_app():
                 strategy_params = request_json.get('strategy_params', {})
                 strategy_class = request_json.get('strategy_class', 'BuyAndHoldStrategy')
                 
-                logger.info(f"Initializing strategy: {strategy_class} with params: {strategy_params}")
+                logger.info("Initializing strategy: %s with params: %s", strategy_class, strategy_params)
                 backtest_engine.set_strategy(strategy_params, strategy_class)
             except Exception as e:
-                logger.error(f"Error setting strategy: {e}")
+                logger.error("Error setting strategy: %s", e)
                 return jsonify({'error': f'Invalid strategy configuration: {str(e)}'}), 400
 
-            # Run backtest
-            results = backtest_engine.run_backtest(market_data)
+            # Run backtest (the bundle scans each frame once and is shared with the metrics)
+            market_bundle = MarketBundle.from_frames(market_data, timeframe)
+            results = backtest_engine.run_backtest(market_bundle)
             
             if not results:
                 return jsonify({'error': 'Backtest failed to produce results'}), 500
             
-            logger.info(f"✅ Backtest finished: {strategy_name}")
+            logger.info("✅ Backtest finished: %s", strategy_name)
             
             # Calculate performance metrics
             try:
-                performance_metrics = PerformanceMetrics(results, market_data)
+                performance_metrics = PerformanceMetrics(results, market_bundle.frames)
                 metrics = performance_metrics.calculate_all_metrics()
-                logger.info(f"📊 Performance metrics calculated")
+                logger.info("📊 Performance metrics calculated")
             except Exception as e:
-                logger.warning(f"Error calculating metrics: {e}")
+                logger.warning("Error calculating metrics: %s", e)
                 metrics = {}
             
-            # Prepare market data for response (convert to serializable format)
-            market_data_response = {}
-            for symbol, data in market_data.items():
-                # Reset index to get timestamp as column
-                data_reset = data.reset_index()
-                
-                # Convert timestamps to strings
-                if 'timestamp' in data_reset.columns:
-                    data_reset['timestamp'] = data_reset['timestamp'].dt.strftime('%Y-%m-%d %H:%M:%S')
-                
-                # Convert to list format for JSON serialization
-                market_data_response[symbol] = {
-                    'timestamps': data_reset['timestamp'].tolist(),
-                    'open': data_reset['open'].tolist(),
-                    'high': data_reset['high'].tolist(), 
-                    'low': data_reset['low'].tolist(),
-                    'close': data_reset['close'].tolist(),
-                    'volume': data_reset['volume'].tolist() if 'volume' in data_reset.columns else []
-                }
-
-            # Ensure graph data timestamps are properly formatted
-            if 'graph_data' in results and 'timestamp' in results['graph_data']:
-                # Handle case where timestamps might already be strings
-                formatted_timestamps = []
-                for ts in results['graph_data']['timestamp']:
-                    if isinstance(ts, str):
-                        formatted_timestamps.append(ts)
-                    else:
-                        formatted_timestamps.append(ts.strftime('%Y-%m-%d %H:%M:%S'))
-                results['graph_data']['timestamp'] = formatted_timestamps
-
-            logger.info(f"📤 Sending response with {len(results.get('trades_history', []))} trades")
+            logger.info(
+                "Market data cache: %d hits, %d misses",
+                cache_hits, len(symbols) - cache_hits
+            )
+            logger.info("📤 Sending response with %d trades", len(results.get('trades_history', [])))
 
-            return jsonify({
+            # Encode the body chunk by chunk here, so a serialization error still reaches the
+            # except below (JSON 500) instead of truncating a 200 that has already started
+            response_body = list(app.json.iter_object({
                 'success': True,
                 'backtest_id': f"{strategy_name}_{int(datetime.now().timestamp())}",
                 'parameters': request_json,
-                'results': results,
                 'metrics': metrics,
+                'results': results,
                 'market_data': market_data_response,
-            })
+            }, stream_keys=('results', 'market_data')))
+            return app.response_class(response_body, mimetype='application/json')
 
         except Exception as e:
             error_traceback = traceback.format_exc()
-            logger.error(f"Error during backtest:\n{error_traceback}")
+            logger.error("Error during backtest:\n%s", error_traceback)
             return jsonify({
                 'error': f'Error during backtest: {str(e)}',
                 'traceback': error_traceback if app.config['DEBUG'] else None
@@ -274,12 +421,12 @@ def create_app():
     @app.route('/api/config/defaults')
     def get_default_config():
         """Returns default configuration for backtest"""
-        return jsonify(app.config['DEFAULT_SETTINGS'])
+        return conditional_json(_CONFIG_ETAG, lambda: app.config['DEFAULT_SETTINGS'])
 
     @app.route('/api/config/supported')
     def get_supported_config():
         """Returns all lists of supported parameters"""
-        return jsonify({
+        return conditional_json(_CONFIG_ETAG, lambda: {
             'symbols': app.config['SUPPORTED_SYMBOLS'],
             'timeframes': app.config['SUPPORTED_TIMEFRAMES'],
             'strategies': app.config['SUPPORTED_STRATEGIES']
@@ -294,7 +441,8 @@ def create_app():
             if not request_json:
                 return jsonify({'error': 'JSON data required'}), 400
             
-            logger.info(f"Mock backtest parameters: {request_json}")
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Mock backtest parameters: %s", request_json)
             
             # Generate mock results
             mock_results = {
@@ -363,7 +511,7 @@ def create_app():
             })
             
         except Exception as e:
-            logger.error(f"Error in mock backtest: {str(e)}")
+            logger.error("Error in mock backtest: %s", e)
             return jsonify({'error': f'Mock backtest error: {str(e)}'}), 500
     
     @app.errorhandler(404)
@@ -374,7 +522,7 @@ def create_app():
     @app.errorhandler(500)
     def internal_error(error):
         """500 error handler"""
-        logger.error(f"Internal server error: {error}")
+        logger.error("Internal server error: %s", error)
         return jsonify({'error': 'Internal server error'}), 500
     
     return app
\ No newline at end of file
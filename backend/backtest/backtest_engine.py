@@ -2,12 +2,14 @@
 Main backtest engine with enhanced portfolio management
 """
 
-from typing import Dict
+from types import MappingProxyType
+from typing import Dict, Union
 import pandas as pd
 import numpy as np
 import logging
 from datetime import datetime
 from .portfolio import Portfolio
+from .market_bundle import MarketBundle
 from ..strategies.buy_and_hold import BuyAndHoldStrategy
 from ..strategies.RSI_strategy import RSIStrategy
 from ..strategies.DCA_strategy import DCA_strategy
@@ -15,6 +17,18 @@ from ..strategies.EMA_RSI_Vol_Strategy import EMACrossoverRSIVolumeStrategy
 
 logger = logging.getLogger(__name__)
 
+# Strategy class name (as used in config.json / API requests) -> strategy class
+STRATEGY_MAP = MappingProxyType({
+    'BuyAndHoldStrategy': BuyAndHoldStrategy,
+    'RSIStrategy': RSIStrategy,
+    'DCA_strategy': DCA_strategy,
+    'EMACrossoverRSIVolumeStrategy': EMACrossoverRSIVolumeStrategy
+})
+
+# Signal type codes used by the engine's signal arrays (0 = no actionable signal)
+SIGNAL_TYPES = (None, 'buy', 'sell')
+SIGNAL_TYPE_CODES = {name: code for code, name in enumerate(SIGNAL_TYPES) if name}
+
 class BacktestEngine:
     """Main engine to run backtests with advanced order types"""
 
@@ -22,6 +36,8 @@ class BacktestEngine:
         """Initialize the backtest engine"""
         logger.info("Backtest engine initialized")
         self.portfolio = Portfolio()
+        self.strategy = None
+        self.timeframe = pd.to_timedelta('1h')
         
     def set_parameters(self, initial_capital: float = 10000, commission_rate: float = 0.001,
                      timeframe: str = '1h', pairs: list = []):
@@ -32,108 +48,124 @@ class BacktestEngine:
 
     def set_strategy(self, strategy_params, strategy_class: str):
         """Set the trading strategy"""
-        strategy_map = {
-            'BuyAndHoldStrategy': BuyAndHoldStrategy,
-            'RSIStrategy': RSIStrategy,
-            'DCA_strategy': DCA_strategy,
-            'EMACrossoverRSIVolumeStrategy': EMACrossoverRSIVolumeStrategy
-        }
-        
-        if strategy_class not in strategy_map:
+        if strategy_class not in STRATEGY_MAP:
             raise ValueError(f"Unknown strategy class: {strategy_class}")
             
-        self.strategy = strategy_map[strategy_class]()
+        self.strategy = STRATEGY_MAP[strategy_class]()
         self.strategy.set_params(strategy_params)
 
-    def run_backtest(self, market_data: Dict[str, pd.DataFrame]) -> Dict:
-        """Run a complete backtest"""
+    def run_backtest(self, market_data: Union[MarketBundle, Dict[str, pd.DataFrame]]) -> Dict:
+        """Run a complete backtest on a market bundle (or raw per-symbol frames)"""
         if self.strategy is None:
             raise ValueError("No strategy configured")
         
         logger.info("Backtest started")
-        self.portfolio.set_market_data(market_data)
+        if not isinstance(market_data, MarketBundle):
+            market_data = MarketBundle.from_frames(market_data, self.timeframe)
+        self.portfolio.set_market_data(market_data.frames)
         
-        # Generate signals for all symbols
-        signals = {}
-        for symbol, data in market_data.items():
+        # Generate signals for all symbols as parallel arrays (timestamp, symbol, type code, params)
+        signal_timestamps, signal_symbols, signal_types, signal_params = [], [], [], []
+        for symbol, data in market_data.frames.items():
             try:
                 symbol_signals = self.strategy.generate_signals(data)
                 if not symbol_signals.empty:
-                    symbol_signals['symbol'] = symbol
-                    signals[symbol] = symbol_signals
+                    type_codes, params = self._encode_signals(symbol_signals['signal'].to_numpy())
+                    signal_timestamps.append(symbol_signals.index.to_numpy())
+                    signal_symbols.append(np.full(len(symbol_signals), symbol, dtype=object))
+                    signal_types.append(type_codes)
+                    signal_params.append(params)
             except Exception as e:
-                logger.warning(f"Failed to generate signals for {symbol}: {e}")
+                logger.warning("Failed to generate signals for %s: %s", symbol, e)
                 continue
         
-        if not signals:
+        if not signal_timestamps:
             logger.warning("No signals generated for any symbol")
             return self._create_empty_results()
         
-        # Merge signals into a single DataFrame
-        signals_df = pd.concat(signals.values(), ignore_index=False)
-        signals_df = signals_df.sort_index()  # Sort by timestamp
+        # Merge signals with one stable sort by timestamp (per-symbol runs are already sorted)
+        timestamps_arr = np.concatenate(signal_timestamps)
+        order = np.argsort(timestamps_arr, kind='mergesort')
+        timestamps_arr = timestamps_arr[order]
+        symbols_arr = np.concatenate(signal_symbols)[order]
+        types_arr = np.concatenate(signal_types)[order]
+        params_arr = np.concatenate(signal_params)[order]
+
+        # Drop empty / unknown signals once so the bar loop only sees actionable ones
+        actionable = types_arr != 0
+        if not actionable.all():
+            timestamps_arr = timestamps_arr[actionable]
+            symbols_arr = symbols_arr[actionable]
+            types_arr = types_arr[actionable]
+            params_arr = params_arr[actionable]
         
-        logger.info(f"{len(signals_df)} signals generated")
+        logger.info("%d signals generated", len(timestamps_arr))
 
         # Execute backtest
-        self._execute_backtest(signals_df, market_data)
+        self._execute_backtest(timestamps_arr, symbols_arr, types_arr, params_arr, market_data)
         
-        logger.info(f"{len(self.portfolio.trades)} trades executed")
+        logger.info("%d trades executed", len(self.portfolio.trades))
 
         # Prepare results
         results = self._prepare_results()
         logger.info("Backtest finished")
         return results
 
-    def _execute_backtest(self, signals_df: pd.DataFrame, market_data: Dict[str, pd.DataFrame]):
-        """Execute the backtest with signals and market data"""
-        # Get time range
-        start_ts = min(data.index.min() for data in market_data.values())
-        end_ts = max(data.index.max() for data in market_data.values())
-        
-        # Process each timestamp
-        for ts in pd.date_range(start=start_ts, end=end_ts, freq=self.timeframe):
-            # Update portfolio (this will process pending orders)
-            self.portfolio.update_graph_data(ts)
-            
-            # Process new signals at this timestamp
-            current_signals = signals_df[signals_df.index == ts]
-            
-            for _, signal_row in current_signals.iterrows():
-                if 'signal' not in signal_row or not signal_row['signal']:
-                    continue
-                    
-                trade = {
-                    'type': signal_row['signal']['type'],
-                    'symbol': signal_row['symbol'],
+    @staticmethod
+    def _encode_signals(signals: np.ndarray) -> tuple:
+        """Split a strategy's signal dicts into an int8 type-code array and a params array"""
+        type_codes = np.fromiter(
+            (SIGNAL_TYPE_CODES.get(signal['type'], 0) if signal else 0 for signal in signals),
+            dtype=np.int8, count=len(signals)
+        )
+        params = np.fromiter(
+            (signal['params'] if signal else None for signal in signals),
+            dtype=object, count=len(signals)
+        )
+        return type_codes, params
+
+    def _execute_backtest(self, timestamps_arr: np.ndarray, symbols_arr: np.ndarray, types_arr: np.ndarray,
+                          params_arr: np.ndarray, market_data: MarketBundle):
+        """Execute the backtest with timestamp-sorted signal arrays and market data"""
+        # Bar timeline as raw datetime64 values (no Timestamp boxing per bar)
+        timeline = market_data.timeline
+        self.portfolio.preallocate_graph_data(len(timeline))
+
+        # Slice bounds of each bar's signals, resolved for the whole timeline at once
+        bar_starts = np.searchsorted(timestamps_arr, timeline, side='left').tolist()
+        bar_ends = np.searchsorted(timestamps_arr, timeline, side='right').tolist()
+
+        # Process each timestamp in one portfolio step, priced from the bar's close row
+        close_matrix = market_data.close_matrix
+        for row, (ts, start, end) in enumerate(zip(timeline, bar_starts, bar_ends)):
+            signals = [
+                {
+                    'type': SIGNAL_TYPES[types_arr[i]],
+                    'symbol': symbols_arr[i],
                     'timestamp': ts,
-                    'params': signal_row['signal']['params'],
+                    'params': params_arr[i],
                 }
-                
-                try:
-                    self.portfolio.execute_trade(trade)
-                except Exception as e:
-                    logger.warning(f"Failed to execute trade at {ts}: {e}")
-                    continue
+                for i in range(start, end)
+            ]
+            self.portfolio.step(ts, signals, close_matrix[row])
 
     def _prepare_results(self) -> Dict:
         """Prepare final results for output"""
         # Convert graph data to proper format
+        # (value series stay float64 arrays, encoded natively by the API's JSON provider)
         graph_data_dict = {}
-        if self.portfolio.graph_data:
-            for key, values in self.portfolio.graph_data.items():
-                if key == 'timestamp':
-                    graph_data_dict[key] = [ts.isoformat() for ts in values]
-                else:
-                    graph_data_dict[key] = values
+        for key, values in self.portfolio.get_graph_data().items():
+            if key == 'timestamp':
+                graph_data_dict[key] = self._format_timestamps(values)
+            else:
+                graph_data_dict[key] = values
 
         # Convert trades to serializable format
-        trades_list = []
-        for trade in self.portfolio.trades:
-            trade_dict = trade.copy()
-            if 'timestamp' in trade_dict:
-                trade_dict['timestamp'] = trade_dict['timestamp'].isoformat()
-            trades_list.append(trade_dict)
+        trades_list = [trade.copy() for trade in self.portfolio.trades]
+        stamped_trades = [trade for trade in trades_list if 'timestamp' in trade]
+        formatted = self._format_timestamps([trade['timestamp'] for trade in stamped_trades])
+        for trade_dict, timestamp in zip(stamped_trades, formatted):
+            trade_dict['timestamp'] = timestamp
 
         return {
             'portfolio_summary': self.portfolio.get_summary(),
@@ -141,6 +173,11 @@ class BacktestEngine:
             'graph_data': graph_data_dict,
         }
 
+    @staticmethod
+    def _format_timestamps(values) -> list:
+        """Format a sequence of timestamps as ISO strings in one vectorized pass"""
+        return pd.DatetimeIndex(values).strftime('%Y-%m-%dT%H:%M:%S').tolist()
+
     def _create_empty_results(self) -> Dict:
         """Create empty results when no signals are generated"""
         return {
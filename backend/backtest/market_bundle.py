@@ -0,0 +1,53 @@
+"""
+Market data bundle shared by the backtest engine, portfolio and metrics
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Union
+import pandas as pd
+import numpy as np
+
+@dataclass
+class MarketBundle:
+    """Per-symbol OHLCV frames plus the aligned bar timeline, built once per backtest"""
+    frames: Dict[str, pd.DataFrame]
+    symbols: List[str]
+    start_ts: pd.Timestamp
+    end_ts: pd.Timestamp
+    timeline: np.ndarray  # datetime64 bar timestamps from start_ts to end_ts
+    close_matrix: np.ndarray  # (len(timeline), len(symbols)) close price at each bar
+
+    @classmethod
+    def from_frames(cls, frames: Dict[str, pd.DataFrame], timeframe: Union[str, pd.Timedelta]) -> 'MarketBundle':
+        """Build the bundle from timestamp-indexed frames, scanning each index once"""
+        symbols = list(frames)
+        if not symbols:
+            # No symbols: an empty timeline, so the backtest runs no bars
+            return cls(
+                frames=frames,
+                symbols=symbols,
+                start_ts=pd.NaT,
+                end_ts=pd.NaT,
+                timeline=np.empty(0, dtype='datetime64[ns]'),
+                close_matrix=np.empty((0, 0), dtype=np.float64),
+            )
+        start_ts = min(data.index[0] for data in frames.values())
+        end_ts = max(data.index[-1] for data in frames.values())
+        timeline_index = pd.date_range(start=start_ts, end=end_ts, freq=pd.to_timedelta(timeframe))
+
+        # Close at each bar: exact bar if present, else the last known close,
+        # else (bar before the symbol's history starts) its first close
+        close_matrix = np.empty((len(timeline_index), len(symbols)), dtype=np.float64)
+        for col, symbol in enumerate(symbols):
+            close = frames[symbol]['close']
+            aligned = close.reindex(timeline_index, method='ffill')
+            close_matrix[:, col] = aligned.fillna(close.iloc[0]).to_numpy()
+
+        return cls(
+            frames=frames,
+            symbols=symbols,
+            start_ts=start_ts,
+            end_ts=end_ts,
+            timeline=timeline_index.to_numpy(),
+            close_matrix=close_matrix,
+        )
@@ -2,39 +2,195 @@
 Performance metrics calculation for backtests with enhanced order types
 """
 
+import math
 import pandas as pd
 import numpy as np
+from functools import cached_property, wraps
 from typing import Dict, List, Optional
 from datetime import datetime
 
+def _cached_metric(method):
+    """Compute a metrics method once per instance and reuse the result on later calls"""
+    name = method.__name__
+
+    @wraps(method)
+    def wrapper(self):
+        if name not in self._metrics_cache:
+            self._metrics_cache[name] = method(self)
+        return self._metrics_cache[name]
+    return wrapper
+
+def _return_moments(returns: np.ndarray) -> tuple:
+    """Mean, std and downside std (ddof=1, NaN below two samples) plus the count of negative returns
+
+    Each deviation sum of squares is one dot product of the mean-centred values,
+    which avoids the cancellation of the raw sum-of-squares formula on
+    low-volatility returns.
+    """
+    n = len(returns)
+    mean = returns.sum() / n
+    if n > 1:
+        centred = returns - mean
+        std = np.sqrt(centred.dot(centred) / (n - 1))
+    else:
+        std = np.nan
+
+    negative = returns[returns < 0]
+    neg_count = len(negative)
+    if neg_count > 1:
+        neg_centred = negative - negative.sum() / neg_count
+        downside_std = np.sqrt(neg_centred.dot(neg_centred) / (neg_count - 1))
+    else:
+        downside_std = np.nan
+    return mean, std, downside_std, neg_count
+
+_NS_PER_DAY = 86_400 * 10**9
+
+def _drawdown_stats(drawdown: np.ndarray, timestamps_ns: np.ndarray) -> tuple:
+    """Average negative drawdown and longest drawdown (deeper than 0.01%) in whole days
+
+    drawdown is a fraction of the running peak, timestamps_ns the matching bar times as int64
+    nanoseconds. A drawdown run lasts from its first bar to the first bar back
+    above the threshold; runs still open at the last bar are not counted. The max
+    drawdown is not recomputed here: it is reduced once with the curve.
+    """
+    negative_drawdowns = drawdown[drawdown < 0]
+    avg_drawdown = negative_drawdowns.mean() if len(negative_drawdowns) > 0 else 0
+
+    # Run boundaries from the in-drawdown mask and its one-bar lag (no per-bar branching);
+    # each end is paired with the last start before it
+    in_dd = drawdown < -0.0001
+    was_in_dd = np.concatenate(([False], in_dd[:-1]))
+    dd_starts = np.flatnonzero(in_dd & ~was_in_dd)
+    dd_ends = np.flatnonzero(~in_dd & was_in_dd)
+    if len(dd_ends) > 0:
+        run_starts = dd_starts[np.searchsorted(dd_starts, dd_ends) - 1]
+        durations = timestamps_ns[dd_ends] - timestamps_ns[run_starts]
+        max_duration = int(durations.max() // _NS_PER_DAY)
+    else:
+        max_duration = 0
+    return avg_drawdown, max_duration
+
+# (max bar spacing in seconds, periods per year): hourly or less, daily, weekly or more
+_PERIODICITY_TABLE = (
+    (3600, 24 * 365),
+    (86400, 365),
+    (float('inf'), 52),
+)
+
+def _periods_per_year(timestamps_ns: np.ndarray) -> int:
+    """Annualization factor from the median bar spacing (robust to gaps), 0 below two bars"""
+    if len(timestamps_ns) < 2:
+        return 0
+    bar_seconds = np.median(np.diff(timestamps_ns)) / 1e9
+    return next(periods for max_seconds, periods in _PERIODICITY_TABLE if bar_seconds <= max_seconds)
+
 class PerformanceMetrics:
     """Enhanced performance metrics calculator"""
     
+    _REPORT_TEMPLATE = """
+=== ENHANCED PERFORMANCE REPORT ===
+
+💰 RETURNS:
+- Total return: {total_return:.2f}%
+- CAGR: {cagr:.2f}%
+
+📊 BENCHMARK COMPARISON:
+- Buy & Hold return: {benchmark_return:.2f}%
+- Strategy outperformance: {excess_return:.2f}%
+
+⚠️ RISK METRICS:
+- Sharpe ratio: {sharpe_ratio:.2f}
+- Sortino ratio: {sortino_ratio:.2f}
+- Calmar ratio: {calmar_ratio:.2f}
+- Volatility: {volatility:.2f}%
+
+📉 DRAWDOWN ANALYSIS:
+- Max drawdown: {max_drawdown:.2f}%
+- Max drawdown duration: {max_dd_duration} days
+- Recovery factor: {recovery_factor:.2f}
+
+🔄 TRADING ACTIVITY:
+- Total trades: {total_trades}
+- Buy orders: {buy_trades}
+- Sell orders: {sell_trades}
+- Total commission paid: ${total_commission:.2f}
+
+💼 PORTFOLIO STATUS:
+- Final value: ${final_value:.2f}
+- Cash: ${cash:.2f}
+- Open orders: {open_orders}
+"""
+    
     def __init__(self, results: Dict, market_data: Optional[Dict[str, pd.DataFrame]] = None):
         self.portfolio_summary = results.get('portfolio_summary', {})
         self.market_data = market_data
+        self._metrics_cache: Dict[str, object] = {}  # {method name: result}, filled on first call
         
-        # Convert graph data to DataFrame
+        # Raw columnar results; DataFrames are only built if graph_data / trades_history are accessed
         graph_data = results.get('graph_data', {})
-        if graph_data and 'timestamp' in graph_data:
-            self.graph_data = pd.DataFrame(graph_data)
-            # Convert timestamp strings back to datetime if needed
-            if len(self.graph_data) > 0 and isinstance(self.graph_data['timestamp'].iloc[0], str):
-                self.graph_data['timestamp'] = pd.to_datetime(self.graph_data['timestamp'])
+        self._raw_graph = graph_data if graph_data and 'timestamp' in graph_data else {}
+        self._raw_trades = results.get('trades_history', [])
+        
+        # Equity curve arrays shared by every metric (returns, running peak, drawdown fraction)
+        if self._raw_graph and len(self._raw_graph['timestamp']) > 0:
+            timestamps = self._raw_graph['timestamp']
+            if isinstance(timestamps[0], str):
+                timestamps = pd.to_datetime(timestamps, format='ISO8601', cache=True)
+            self._timestamps_ns = np.asarray(timestamps, dtype='datetime64[ns]').view(np.int64)
+            self._values = np.ascontiguousarray(self._raw_graph['total_value'], dtype=np.float64)
+            benchmark = self._raw_graph.get('benchmark')
         else:
-            self.graph_data = pd.DataFrame()
-        
-        # Convert trades history to DataFrame
-        trades_data = results.get('trades_history', [])
-        if trades_data:
-            self.trades_history = pd.DataFrame(trades_data)
-            # Convert timestamp strings back to datetime if needed
-            if len(self.trades_history) > 0 and 'timestamp' in self.trades_history.columns:
-                if isinstance(self.trades_history['timestamp'].iloc[0], str):
-                    self.trades_history['timestamp'] = pd.to_datetime(self.trades_history['timestamp'])
+            self._timestamps_ns = np.empty(0, dtype=np.int64)
+            self._values = np.empty(0, dtype=np.float64)
+            benchmark = None
+        self._n_bars = len(self._values)
+        self._start_iso = pd.Timestamp(self._timestamps_ns[0]).isoformat() if self._n_bars else None
+        self._end_iso = pd.Timestamp(self._timestamps_ns[-1]).isoformat() if self._n_bars else None
+        
+        if benchmark is not None:
+            # Strategy and benchmark share the bar index: take both returns in one 2-row pass
+            self._benchmark = np.ascontiguousarray(benchmark, dtype=np.float64)
+            curves = np.vstack((self._values, self._benchmark))
+            self._returns, self._benchmark_returns = np.diff(curves, axis=1) / curves[:, :-1]
         else:
-            self.trades_history = pd.DataFrame()
-        
+            self._benchmark = None
+            self._benchmark_returns = None
+            self._returns = np.diff(self._values) / self._values[:-1]
+        # Bar periodicity is fixed per instance: resolve the annualization factors once
+        self._periods_per_year = _periods_per_year(self._timestamps_ns)
+        self._sqrt_periods_per_year = math.sqrt(self._periods_per_year)
+        self._peak = np.maximum.accumulate(self._values)
+        self._drawdown = (self._values - self._peak) / self._peak
+        self._max_drawdown = self._drawdown.min() if self._n_bars else 0.0  # fraction, shared by calmar/recovery
+    
+    @cached_property
+    def graph_data(self) -> pd.DataFrame:
+        """Graph data as a DataFrame (timestamps parsed, value columns float64), built on first access"""
+        if self._n_bars == 0:
+            return pd.DataFrame()
+        graph_data = pd.DataFrame(self._raw_graph)
+        graph_data['timestamp'] = self._timestamps_ns.view('datetime64[ns]')
+        graph_data['total_value'] = self._values
+        if self._benchmark is not None:
+            graph_data['benchmark'] = self._benchmark
+        return graph_data
+    
+    @cached_property
+    def trades_history(self) -> pd.DataFrame:
+        """Trades history as a DataFrame, built on first access"""
+        if not self._raw_trades:
+            return pd.DataFrame()
+        trades_history = pd.DataFrame(self._raw_trades)
+        # Convert timestamp strings back to datetime if needed
+        if 'timestamp' in trades_history.columns and isinstance(trades_history['timestamp'].iloc[0], str):
+            trades_history['timestamp'] = pd.to_datetime(trades_history['timestamp'], format='ISO8601', cache=True)
+        # Few distinct trade types: categorical comparisons are integer code checks
+        if 'type' in trades_history.columns:
+            trades_history['type'] = trades_history['type'].astype('category')
+        return trades_history
+        
+    @_cached_metric
     def calculate_all_metrics(self) -> Dict:
         """Calculates all performance metrics"""
         return_metrics = self._calculate_return_metrics()
@@ -51,6 +207,7 @@ class PerformanceMetrics:
             'drawdown_metrics': drawdown_metrics
         }
     
+    @_cached_metric
     def _calculate_return_metrics(self) -> Dict:
         """Calculates return metrics"""
         initial = self.portfolio_summary.get('initial_capital', 0)
@@ -69,10 +226,8 @@ class PerformanceMetrics:
         annualized_return = 0
         cagr = 0
         
-        if not self.graph_data.empty and len(self.graph_data) > 1:
-            start_date = self.graph_data['timestamp'].iloc[0]
-            end_date = self.graph_data['timestamp'].iloc[-1]
-            days = (end_date - start_date).days
+        if self._n_bars > 1:
+            days = int(self._timestamps_ns[-1] - self._timestamps_ns[0]) // _NS_PER_DAY
             
             if days > 0:
                 years = days / 365.25
@@ -87,9 +242,10 @@ class PerformanceMetrics:
             'cagr_pct': cagr * 100
         }
     
+    @_cached_metric
     def _calculate_risk_metrics(self) -> Dict:
         """Calculates risk metrics"""
-        if self.graph_data.empty or len(self.graph_data) < 2:
+        if self._n_bars < 2:
             return {
                 'volatility_pct': 0, 
                 'sharpe_ratio': 0,
@@ -97,8 +253,7 @@ class PerformanceMetrics:
                 'calmar_ratio': 0
             }
 
-        values = self.graph_data['total_value']
-        returns = values.pct_change().dropna()
+        returns = self._returns
         
         if len(returns) == 0:
             return {
@@ -108,37 +263,31 @@ class PerformanceMetrics:
                 'calmar_ratio': 0
             }
         
-        # Determine frequency for annualization
-        time_diff = self.graph_data['timestamp'].iloc[1] - self.graph_data['timestamp'].iloc[0]
-        if time_diff.total_seconds() <= 3600:  # Hourly or less
-            periods_per_year = 24 * 365
-        elif time_diff.total_seconds() <= 86400:  # Daily
-            periods_per_year = 365
-        else:  # Weekly or more
-            periods_per_year = 52
+        periods_per_year = self._periods_per_year
+        sqrt_periods_per_year = self._sqrt_periods_per_year
+        
+        mean, std, downside_std, negative_count = _return_moments(returns)
         
         # Volatility (annualized)
-        volatility = returns.std() * np.sqrt(periods_per_year) if len(returns) > 1 else 0
+        volatility = std * sqrt_periods_per_year if len(returns) > 1 else 0
         
         # Mean return (annualized)
-        mean_return = returns.mean() * periods_per_year
+        mean_return = mean * periods_per_year
         
         # Sharpe ratio (assuming risk-free rate = 0)
         sharpe_ratio = mean_return / volatility if volatility > 0 else 0
         
         # Sortino ratio
-        negative_returns = returns[returns < 0]
-        if len(negative_returns) > 0:
-            downside_deviation = negative_returns.std() * np.sqrt(periods_per_year)
+        if negative_count > 0:
+            downside_deviation = downside_std * sqrt_periods_per_year if negative_count > 1 else 0
             sortino_ratio = mean_return / downside_deviation if downside_deviation > 0 else 0
         else:
             sortino_ratio = sharpe_ratio  # No negative returns
         
         # Calmar ratio (CAGR / Max Drawdown)
-        max_drawdown = self._calculate_max_drawdown()
-        return_metrics = self._calculate_return_metrics()
-        cagr = return_metrics['cagr_pct'] / 100
-        calmar_ratio = abs(cagr / (max_drawdown / 100)) if max_drawdown != 0 else 0
+        max_drawdown = self._max_drawdown
+        cagr = self._calculate_return_metrics()['cagr_pct'] / 100
+        calmar_ratio = abs(cagr / max_drawdown) if max_drawdown != 0 else 0
         
         return {
             'volatility_pct': volatility * 100,
@@ -147,19 +296,15 @@ class PerformanceMetrics:
             'calmar_ratio': calmar_ratio
         }
     
+    @_cached_metric
     def _calculate_max_drawdown(self) -> float:
         """Calculate maximum drawdown percentage"""
-        if self.graph_data.empty:
-            return 0
-            
-        values = self.graph_data['total_value']
-        peak = values.cummax()
-        drawdown = (values - peak) / peak * 100
-        return drawdown.min()
+        return self._max_drawdown * 100
     
+    @_cached_metric
     def _calculate_drawdown_metrics(self) -> Dict:
         """Calculate detailed drawdown metrics"""
-        if self.graph_data.empty:
+        if self._n_bars == 0:
             return {
                 'max_drawdown_pct': 0,
                 'avg_drawdown_pct': 0,
@@ -167,43 +312,24 @@ class PerformanceMetrics:
                 'recovery_factor': 0
             }
         
-        values = self.graph_data['total_value']
-        timestamps = self.graph_data['timestamp']
-        peak = values.cummax()
-        drawdown = (values - peak) / peak * 100
-        
-        max_drawdown = drawdown.min()
-        
-        # Average drawdown (only negative values)
-        negative_drawdowns = drawdown[drawdown < 0]
-        avg_drawdown = negative_drawdowns.mean() if len(negative_drawdowns) > 0 else 0
-        
-        # Maximum drawdown duration
-        max_dd_duration = 0
-        current_dd_start = None
-        
-        for i, dd in enumerate(drawdown):
-            if dd < -0.01 and current_dd_start is None:  # Start of drawdown (>1%)
-                current_dd_start = timestamps.iloc[i]
-            elif dd >= -0.01 and current_dd_start is not None:  # End of drawdown
-                duration = (timestamps.iloc[i] - current_dd_start).days
-                max_dd_duration = max(max_dd_duration, duration)
-                current_dd_start = None
+        max_drawdown = self._max_drawdown
+        avg_drawdown, max_dd_duration = _drawdown_stats(self._drawdown, self._timestamps_ns)
         
         # Recovery factor
-        total_return = self._calculate_return_metrics()['total_return_pct']
+        total_return = self._calculate_return_metrics()['total_return_pct'] / 100
         recovery_factor = abs(total_return / max_drawdown) if max_drawdown != 0 else 0
         
         return {
-            'max_drawdown_pct': max_drawdown,
-            'avg_drawdown_pct': avg_drawdown,
+            'max_drawdown_pct': max_drawdown * 100,
+            'avg_drawdown_pct': avg_drawdown * 100,
             'max_drawdown_duration_days': max_dd_duration,
             'recovery_factor': recovery_factor
         }
     
+    @_cached_metric
     def _calculate_trade_metrics(self) -> Dict:
         """Calculates enhanced trading metrics"""
-        if self.trades_history.empty:
+        if not self._raw_trades:
             return {
                 'total_trades': 0, 
                 'buy_trades': 0,
@@ -218,9 +344,15 @@ class PerformanceMetrics:
                 'total_commission': 0
             }
         
-        executed_trades = self.trades_history[self.trades_history.get('executed', False) == True]
+        # Boolean masks over the trade columns (counted, never used to copy rows out)
+        trades = self.trades_history
+        if 'executed' in trades.columns:
+            executed = trades['executed'].to_numpy() == True
+        else:
+            executed = np.zeros(len(trades), dtype=bool)
+        total_trades = int(np.count_nonzero(executed))
         
-        if len(executed_trades) == 0:
+        if total_trades == 0:
             return {
                 'total_trades': 0, 
                 'buy_trades': 0,
@@ -235,12 +367,13 @@ class PerformanceMetrics:
                 'total_commission': 0
             }
         
-        total_trades = len(executed_trades)
-        buy_trades = len(executed_trades[executed_trades['type'] == 'buy'])
-        sell_trades = len(executed_trades[executed_trades['type'] == 'sell'])
+        types = trades['type']
+        buy_trades = int(np.count_nonzero((types == 'buy').to_numpy() & executed))
+        sell_trades = int(np.count_nonzero((types == 'sell').to_numpy() & executed))
         
         # Calculate trade returns (simplified approach)
-        total_commission = executed_trades['commission'].sum() if 'commission' in executed_trades.columns else 0
+        total_commission = (np.nansum(trades['commission'].to_numpy(dtype=np.float64)[executed])
+                            if 'commission' in trades.columns else 0)
         
         # For more detailed trade analysis, we would need to match buy/sell pairs
         # This is a simplified version
@@ -259,9 +392,10 @@ class PerformanceMetrics:
             'total_commission': total_commission
         }
     
+    @_cached_metric
     def _calculate_benchmark_metrics(self) -> Dict:
         """Calculates metrics vs benchmark (buy and hold)"""
-        if self.graph_data.empty or 'benchmark' not in self.graph_data.columns:
+        if self._n_bars == 0 or self._benchmark is None:
             return {
                 'benchmark_return_pct': 0,
                 'excess_return_pct': 0,
@@ -270,8 +404,8 @@ class PerformanceMetrics:
             }
         
         # Benchmark return
-        initial_benchmark = self.graph_data['benchmark'].iloc[0]
-        final_benchmark = self.graph_data['benchmark'].iloc[-1]
+        initial_benchmark = self._benchmark[0]
+        final_benchmark = self._benchmark[-1]
         benchmark_return = ((final_benchmark - initial_benchmark) / initial_benchmark * 100 
                           if initial_benchmark != 0 else 0)
 
@@ -283,17 +417,15 @@ class PerformanceMetrics:
         excess_return = strategy_return - benchmark_return
         
         # Tracking error and information ratio
-        if len(self.graph_data) > 1:
-            strategy_returns = self.graph_data['total_value'].pct_change().dropna()
-            benchmark_returns = self.graph_data['benchmark'].pct_change().dropna()
-            
-            if len(strategy_returns) == len(benchmark_returns) and len(strategy_returns) > 1:
-                excess_returns = strategy_returns - benchmark_returns
-                tracking_error = excess_returns.std() * np.sqrt(252) * 100  # Annualized
-                information_ratio = (excess_returns.mean() * 252) / (excess_returns.std()) if excess_returns.std() > 0 else 0
-            else:
-                tracking_error = 0
-                information_ratio = 0
+        # (per-bar return differences, both series taken on the same bars)
+        if len(self._returns) > 1:
+            excess_returns = self._returns - self._benchmark_returns
+            excess_mean, excess_std, _, _ = _return_moments(excess_returns)
+            # Annualized like the Sharpe ratio: mean scales with periods, std with their square root
+            annual_tracking_error = excess_std * self._sqrt_periods_per_year
+            tracking_error = annual_tracking_error * 100
+            information_ratio = ((excess_mean * self._periods_per_year) / annual_tracking_error
+                                 if annual_tracking_error > 0 else 0)
         else:
             tracking_error = 0
             information_ratio = 0
@@ -305,6 +437,7 @@ class PerformanceMetrics:
             'information_ratio': information_ratio
         }
     
+    @_cached_metric
     def get_summary_report(self) -> str:
         """Generates a comprehensive summary report"""
         metrics = self.calculate_all_metrics()
@@ -316,59 +449,26 @@ class PerformanceMetrics:
         benchmark_m = metrics.get('benchmark_metrics', {})
         drawdown_m = metrics.get('drawdown_metrics', {})
         
-        total_return = return_m.get('total_return_pct', 0)
-        cagr = return_m.get('cagr_pct', 0)
-        
-        benchmark_return = benchmark_m.get('benchmark_return_pct', 0)
-        excess_return = benchmark_m.get('excess_return_pct', 0)
-        
-        sharpe_ratio = risk_m.get('sharpe_ratio', 0)
-        sortino_ratio = risk_m.get('sortino_ratio', 0)
-        calmar_ratio = risk_m.get('calmar_ratio', 0)
-        max_drawdown = drawdown_m.get('max_drawdown_pct', 0)
-        volatility = risk_m.get('volatility_pct', 0)
-        
-        total_trades = trade_m.get('total_trades', 0)
-        buy_trades = trade_m.get('buy_trades', 0)
-        sell_trades = trade_m.get('sell_trades', 0)
-        total_commission = trade_m.get('total_commission', 0)
-        
-        max_dd_duration = drawdown_m.get('max_drawdown_duration_days', 0)
-        recovery_factor = drawdown_m.get('recovery_factor', 0)
-        
-        return f"""
-=== ENHANCED PERFORMANCE REPORT ===
-
-💰 RETURNS:
-- Total return: {total_return:.2f}%
-- CAGR: {cagr:.2f}%
-
-📊 BENCHMARK COMPARISON:
-- Buy & Hold return: {benchmark_return:.2f}%
-- Strategy outperformance: {excess_return:.2f}%
-
-⚠️ RISK METRICS:
-- Sharpe ratio: {sharpe_ratio:.2f}
-- Sortino ratio: {sortino_ratio:.2f}
-- Calmar ratio: {calmar_ratio:.2f}
-- Volatility: {volatility:.2f}%
-
-📉 DRAWDOWN ANALYSIS:
-- Max drawdown: {max_drawdown:.2f}%
-- Max drawdown duration: {max_dd_duration} days
-- Recovery factor: {recovery_factor:.2f}
-
-🔄 TRADING ACTIVITY:
-- Total trades: {total_trades}
-- Buy orders: {buy_trades}
-- Sell orders: {sell_trades}
-- Total commission paid: ${total_commission:.2f}
-
-💼 PORTFOLIO STATUS:
-- Final value: ${self.portfolio_summary.get('final_value', 0):.2f}
-- Cash: ${self.portfolio_summary.get('cash', 0):.2f}
-- Open orders: {self.portfolio_summary.get('open_orders', 0)}
-"""
+        return self._REPORT_TEMPLATE.format(
+            total_return=return_m.get('total_return_pct', 0),
+            cagr=return_m.get('cagr_pct', 0),
+            benchmark_return=benchmark_m.get('benchmark_return_pct', 0),
+            excess_return=benchmark_m.get('excess_return_pct', 0),
+            sharpe_ratio=risk_m.get('sharpe_ratio', 0),
+            sortino_ratio=risk_m.get('sortino_ratio', 0),
+            calmar_ratio=risk_m.get('calmar_ratio', 0),
+            volatility=risk_m.get('volatility_pct', 0),
+            max_drawdown=drawdown_m.get('max_drawdown_pct', 0),
+            max_dd_duration=drawdown_m.get('max_drawdown_duration_days', 0),
+            recovery_factor=drawdown_m.get('recovery_factor', 0),
+            total_trades=trade_m.get('total_trades', 0),
+            buy_trades=trade_m.get('buy_trades', 0),
+            sell_trades=trade_m.get('sell_trades', 0),
+            total_commission=trade_m.get('total_commission', 0),
+            final_value=self.portfolio_summary.get('final_value', 0),
+            cash=self.portfolio_summary.get('cash', 0),
+            open_orders=self.portfolio_summary.get('open_orders', 0)
+        )
     
     def get_detailed_metrics(self) -> Dict:
         """Returns all metrics in a structured format for further analysis"""
@@ -381,10 +481,10 @@ class PerformanceMetrics:
         return {
             'metrics': metrics,
             'portfolio_summary': self.portfolio_summary,
-            'trade_count': len(self.trades_history),
-            'data_points': len(self.graph_data),
+            'trade_count': len(self._raw_trades),
+            'data_points': self._n_bars,
             'timestamp_range': {
-                'start': self.graph_data['timestamp'].iloc[0].isoformat() if not self.graph_data.empty else None,
-                'end': self.graph_data['timestamp'].iloc[-1].isoformat() if not self.graph_data.empty else None
+                'start': self._start_iso,
+                'end': self._end_iso
             }
         }
\ No newline at end of file
@@ -6,7 +6,7 @@ import pandas as pd
 import numpy as np
 import logging
 from datetime import datetime, timedelta
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 from dataclasses import dataclass
 from enum import Enum
 
@@ -42,8 +42,112 @@ class Order:
     # For OCO orders
     linked_order_id: Optional[str] = None
     
-    # For time-based orders
-    expiry_time: Optional[pd.Timestamp] = None
+    # For time-based orders (nanoseconds since the epoch)
+    expiry_time: Optional[int] = None
+
+# Integer codes used by the order book arrays
+ORDER_TYPE_CODES = {OrderType.STOP_LOSS: 0, OrderType.TAKE_PROFIT: 1, OrderType.TRAILING_STOP: 2}
+ORDER_TYPES = (OrderType.STOP_LOSS, OrderType.TAKE_PROFIT, OrderType.TRAILING_STOP)
+NO_EXPIRY_NS = np.iinfo(np.int64).max
+NS_PER_HOUR = 3_600_000_000_000
+
+class OrderBook:
+    """Open conditional orders stored as parallel arrays (one slot per order, in creation order)
+
+    Numeric order state lives in NumPy arrays so a whole bar can be checked
+    with a few vectorized operations; ids and params stay in Python lists.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        """Drop every order"""
+        self._size = 0
+        self.ids: List[str] = []
+        self.params: List[Dict] = []
+        self.arrays: Dict[str, np.ndarray] = {
+            'column': np.empty(0, dtype=np.int64),  # symbol column in the bar price vector
+            'order_type': np.empty(0, dtype=np.int8),
+            'quantity': np.empty(0, dtype=np.float64),
+            'trigger_price': np.empty(0, dtype=np.float64),  # NaN until known (trailing stops)
+            'trail_percent': np.empty(0, dtype=np.float64),
+            'highest_price': np.empty(0, dtype=np.float64),
+            'expiry_ns': np.empty(0, dtype=np.int64),
+            'active': np.empty(0, dtype=bool)
+        }
+
+    def __len__(self) -> int:
+        return self._size
+
+    def active_count(self) -> int:
+        """Number of orders still active"""
+        return int(np.count_nonzero(self.arrays['active'][:self._size]))
+
+    def add(self, order: Order, column: int):
+        """Append an order whose symbol sits at column of the bar price vector"""
+        i = self._size
+        if i == len(self.arrays['active']):
+            for key, values in self.arrays.items():
+                grown = np.empty(max(2 * i, 16), dtype=values.dtype)
+                grown[:i] = values
+                self.arrays[key] = grown
+
+        a = self.arrays
+        a['column'][i] = column
+        a['order_type'][i] = ORDER_TYPE_CODES[order.order_type]
+        a['quantity'][i] = order.quantity
+        a['trigger_price'][i] = np.nan if order.trigger_price is None else order.trigger_price
+        a['trail_percent'][i] = np.nan if order.trail_percent is None else order.trail_percent
+        a['highest_price'][i] = np.nan if order.highest_price is None else order.highest_price
+        a['expiry_ns'][i] = NO_EXPIRY_NS if order.expiry_time is None else order.expiry_time
+        a['active'][i] = order.is_active
+        self.ids.append(order.id)
+        self.params.append(order.params)
+        self._size = i + 1
+
+    def scan(self, prices: np.ndarray, now_ns: int) -> np.ndarray:
+        """Expire, update trailing stops and return the indices of orders triggered at these prices
+
+        Expired orders are deactivated here; triggered ones are left for the
+        caller to execute and deactivate.
+        """
+        n = self._size
+        a = self.arrays
+        active = a['active'][:n]
+        active &= a['expiry_ns'][:n] > now_ns
+
+        price = prices[a['column'][:n]]
+        live = active & (price > 0)
+        order_type = a['order_type'][:n]
+        trigger = a['trigger_price'][:n]
+
+        # Trailing stops follow new highs before being checked
+        highest = a['highest_price'][:n]
+        raised = live & (order_type == 2) & (price > highest)
+        highest[raised] = price[raised]
+        trigger[raised] = highest[raised] * (1 - a['trail_percent'][:n][raised])
+
+        # Take profit fires at or above its trigger, stop loss / trailing stop at or below
+        # (a NaN trigger never fires)
+        hit = np.where(order_type == 1, price >= trigger, price <= trigger)
+        return np.flatnonzero(live & hit)
+
+    def compact(self):
+        """Drop inactive orders once they fill at least half the slots, keeping creation order
+
+        Inactive slots are skipped by scan(), so compacting lazily keeps the
+        cleanup O(n) amortized instead of O(n) on every bar.
+        """
+        n = self._size
+        keep = np.flatnonzero(self.arrays['active'][:n])
+        if 2 * len(keep) > n:
+            return
+        for key, values in self.arrays.items():
+            values[:len(keep)] = values[keep]
+        self.ids = [self.ids[i] for i in keep]
+        self.params = [self.params[i] for i in keep]
+        self._size = len(keep)
 
 class Portfolio:
     """Class to simulate a multi-pair trading portfolio with advanced order types"""
@@ -55,8 +159,8 @@ class Portfolio:
         # Portfolio state
         self.symbols = pairs
         self.cash = initial_capital
-        self.positions: Dict[str, float] = {}  # {symbol: quantity}
-        self.open_orders: List[Order] = []  # List of open orders
+        self.positions: np.ndarray = np.zeros(0, dtype=np.float64)  # quantity per symbol, in _price_columns order
+        self.open_orders = OrderBook()  # Open conditional orders
         self._order_counter = 0
 
         # Benchmark
@@ -64,14 +168,16 @@ class Portfolio:
 
         # History
         self.trades: List[Dict] = []
-        self.graph_data: Dict[str, List] = {
-            'timestamp': [],
-            'total_value': [],
-            'benchmark': []
-        }
+        self._price_columns: Dict[str, int] = {}  # {symbol: column in the bar price vector}
+        self.graph_data: Dict[str, np.ndarray] = {}
+        self._graph_size = 0
+        self.preallocate_graph_data(0)
         self.total_commission = 0.0
         self.market_data: Optional[Dict[str, pd.DataFrame]] = None
-        self.current_prices: Dict[str, float] = {}
+        self._bar_prices: Optional[np.ndarray] = None  # close prices of the bar being stepped
+        self._close_arrays: Dict[str, np.ndarray] = {}  # {symbol: close prices}
+        self._index_ns: Dict[str, np.ndarray] = {}  # {symbol: bar timestamps as int64 nanoseconds}
+        self._final_prices: np.ndarray = np.zeros(0, dtype=np.float64)  # last close of each symbol, in column order
         
         logger.info(f"Portfolio initialized: {initial_capital} USDT")
         
@@ -81,25 +187,36 @@ class Portfolio:
         self.commission_rate = commission_rate
         self.symbols = pairs
         self.cash = initial_capital
-        self.positions.clear()
+        self.positions = np.zeros(0, dtype=np.float64)
         self.open_orders.clear()
         self._order_counter = 0
+        self.benchmark_positions.clear()
         self.trades.clear()
-        self.graph_data = {
-            'timestamp': [],
-            'total_value': [],
-            'benchmark': []
-        }
+        self._price_columns = {}
+        self.preallocate_graph_data(0)
         self.total_commission = 0.0
         self.market_data = None
-        self.current_prices.clear()
+        self._bar_prices = None
+        self._close_arrays = {}
+        self._index_ns = {}
+        self._final_prices = np.zeros(0, dtype=np.float64)
         
         logger.info(f"Portfolio reset: {initial_capital} USDC")
         
     def set_market_data(self, market_data: Dict[str, pd.DataFrame]):
         """Set market data for the portfolio"""
+        # Price lookups binary-search the bar timestamps, which only works on time-ordered data
+        unsorted = [symbol for symbol, data in market_data.items() if not data.index.is_monotonic_increasing]
+        if unsorted:
+            raise ValueError(f"Market data is not sorted by time for: {', '.join(unsorted)}")
+        
         self.market_data = market_data
-        self.current_prices = {symbol: data['close'].iloc[-1] for symbol, data in market_data.items()}
+        self._price_columns = {symbol: col for col, symbol in enumerate(market_data)}
+        self.positions = np.zeros(len(self._price_columns), dtype=np.float64)
+        self._close_arrays = {symbol: data['close'].to_numpy(dtype=np.float64) for symbol, data in market_data.items()}
+        self._index_ns = {symbol: data.index.as_unit('ns').asi8 for symbol, data in market_data.items()}
+        # Every symbol is priced at its last close once the backtest is over
+        self._final_prices = np.array([closes[-1] for closes in self._close_arrays.values()], dtype=np.float64)
         
         # Initialize benchmark positions (equal weight buy and hold)
         symbols_count = len(self.symbols)
@@ -112,6 +229,40 @@ class Portfolio:
 
         logger.info(f"Market data set for {len(market_data)} symbols")
 
+    def preallocate_graph_data(self, n_steps: int):
+        """Allocate (and empty) the per-bar records for a backtest of n_steps bars
+
+        Each bar records its cash, held quantities and close prices (one column
+        per market data symbol); the value curves are derived from them in
+        get_graph_data.
+        """
+        n_symbols = len(self._price_columns)
+        self.graph_data = {
+            'timestamp': np.empty(n_steps, dtype='datetime64[ns]'),
+            'cash': np.empty(n_steps, dtype=np.float64),
+            'positions': np.empty((n_steps, n_symbols), dtype=np.float64),
+            'prices': np.empty((n_steps, n_symbols), dtype=np.float64)
+        }
+        self._graph_size = 0
+
+    def get_graph_data(self) -> Dict[str, np.ndarray]:
+        """Return the portfolio and benchmark value curves over the bars recorded so far"""
+        n = self._graph_size
+        positions = self.graph_data['positions'][:n]
+        prices = self.graph_data['prices'][:n]
+        benchmark_quantities = self._benchmark_quantities()
+        return {
+            'timestamp': self.graph_data['timestamp'][:n],
+            'total_value': self.graph_data['cash'][:n] + (positions * prices).sum(axis=1),
+            'benchmark': prices @ benchmark_quantities
+        }
+
+    def _benchmark_quantities(self) -> np.ndarray:
+        """Buy and hold quantities in price column order (0 for symbols without a benchmark position)"""
+        return np.array(
+            [self.benchmark_positions.get(symbol, 0.0) for symbol in self._price_columns], dtype=np.float64
+        )
+
     def _generate_order_id(self) -> str:
         """Generate unique order ID"""
         self._order_counter += 1
@@ -119,42 +270,27 @@ class Portfolio:
 
     def _get_current_price(self, symbol: str, timestamp: pd.Timestamp) -> float:
         """Get current price for a symbol at timestamp"""
-        if self.market_data and symbol in self.market_data:
-            try:
-                return self.market_data[symbol].loc[timestamp]['close']
-            except KeyError:
-                # If exact timestamp not found, get the nearest available price
-                available_times = self.market_data[symbol].index
-                nearest_time = available_times[available_times <= timestamp][-1] if len(available_times[available_times <= timestamp]) > 0 else available_times[0]
-                return self.market_data[symbol].loc[nearest_time]['close']
+        # Inside step() every lookup is for the current bar: read its price vector
+        if self._bar_prices is not None:
+            col = self._price_columns.get(symbol)
+            if col is not None:
+                return self._bar_prices[col]
+        if symbol in self._index_ns:
+            # Exact bar, else the last bar before timestamp, else (before the history starts) the first bar
+            timestamp_ns = np.datetime64(timestamp, 'ns').astype(np.int64)
+            i = np.searchsorted(self._index_ns[symbol], timestamp_ns, side='right') - 1
+            return self._close_arrays[symbol][max(i, 0)]
         return 0.0
 
-    def _get_total_usd_value(self, timestamp: pd.Timestamp) -> float:
-        """Return the total USD value of the portfolio"""
-        total_value = self.cash
-        for symbol, quantity in self.positions.items():
-            if quantity > 0:
-                price = self._get_current_price(symbol, timestamp)
-                total_value += quantity * price
-        return total_value
-    
-    def _get_benchmark_value(self, timestamp: pd.Timestamp) -> float:
-        """Return the total benchmark value"""
-        total_value = 0.0
-        for symbol, quantity in self.benchmark_positions.items():
-            price = self._get_current_price(symbol, timestamp)
-            total_value += quantity * price
-        return total_value
-
-    def execute_trade(self, trade: Dict) -> Dict:
-        """Execute a trade on the portfolio"""
+    def execute_trade(self, trade: Dict, price: Optional[float] = None) -> Dict:
+        """Execute a trade on the portfolio (at price when given, else the symbol's price at the trade timestamp)"""
         trade_result = trade.copy()
         trade_result['executed'] = False
         
         if trade['type'] == "buy":
-            trade_result = self._execute_buy_order(trade)
+            trade_result = self._execute_buy_order(trade, price)
         elif trade['type'] == "sell":
-            trade_result = self._execute_sell_order(trade)
+            trade_result = self._execute_sell_order(trade, price)
 
         if trade_result['executed']:
             self.trades.append(trade_result)
@@ -163,7 +299,24 @@ class Portfolio:
 
         return trade_result
 
-    def _execute_buy_order(self, trade: Dict) -> Dict:
+    def execute_trades(self, trades: List[Dict], price_vector: np.ndarray) -> List[Dict]:
+        """Execute one bar's trades in signal order, priced from the bar's close vector
+
+        The vector is converted to Python floats once for the whole batch. Cash and
+        positions are still updated trade by trade, as a portion-based order depends
+        on what the previous trades of the bar left.
+        """
+        prices = price_vector.tolist()
+        results = []
+        for trade in trades:
+            col = self._price_columns.get(trade['symbol'])
+            try:
+                results.append(self.execute_trade(trade, prices[col] if col is not None else None))
+            except Exception as e:
+                logger.warning("Failed to execute trade at %s: %s", trade['timestamp'], e)
+        return results
+
+    def _execute_buy_order(self, trade: Dict, price: Optional[float] = None) -> Dict:
         """Execute a market buy order"""
         params = trade['params']
         symbol = trade['symbol']
@@ -182,7 +335,11 @@ class Portfolio:
         if self.cash < total_cost or usd_value <= 5:
             return trade
         
-        price = self._get_current_price(symbol, timestamp)
+        col = self._price_columns.get(symbol)
+        if col is None:
+            return trade
+        if price is None:
+            price = self._get_current_price(symbol, timestamp)
         if price <= 0:
             return trade
             
@@ -191,9 +348,7 @@ class Portfolio:
 
         # Update portfolio
         self.cash -= total_cost
-        if symbol not in self.positions:
-            self.positions[symbol] = 0
-        self.positions[symbol] += quantity
+        self.positions[col] += quantity
         self.total_commission += commission
 
         return {
@@ -208,21 +363,23 @@ class Portfolio:
             'params': params
         }
 
-    def _execute_sell_order(self, trade: Dict) -> Dict:
+    def _execute_sell_order(self, trade: Dict, price: Optional[float] = None) -> Dict:
         """Execute a market sell order"""
         params = trade['params']
         symbol = trade['symbol']
         timestamp = trade['timestamp']
         
-        if symbol not in self.positions:
-            self.positions[symbol] = 0
+        col = self._price_columns.get(symbol)
+        if col is None:
+            return trade
 
-        quantity_to_sell = self.positions[symbol] * params.get('portion', 1.0)
+        quantity_to_sell = self.positions[col] * params.get('portion', 1.0)
         
-        if self.positions[symbol] < quantity_to_sell:
+        if self.positions[col] < quantity_to_sell:
             return trade
             
-        price = self._get_current_price(symbol, timestamp)
+        if price is None:
+            price = self._get_current_price(symbol, timestamp)
         if price <= 0:
             return trade
             
@@ -235,7 +392,7 @@ class Portfolio:
 
         # Update portfolio
         self.cash += net_proceeds
-        self.positions[symbol] -= quantity_to_sell
+        self.positions[col] -= quantity_to_sell
         self.total_commission += commission
 
         return {
@@ -260,153 +417,138 @@ class Portfolio:
         entry_price = executed_trade['price']
         quantity = executed_trade['quantity']
         
-        # Create stop loss order
-        if 'stop_loss' in params and params['stop_loss']:
-            stop_price = entry_price * (1 - params['stop_loss'])
-            
-            stop_order = Order(
-                id=self._generate_order_id(),
-                symbol=symbol,
-                order_type=OrderType.STOP_LOSS,
-                quantity=quantity * params.get('portion_sell', 1.0),
-                timestamp_created=executed_trade['timestamp'],
-                trigger_price=stop_price,
-                params={'portion': params.get('portion_sell', 1.0)},
-                expiry_time=self._calculate_expiry_time(executed_trade['timestamp'], params)
-            )
-            self.open_orders.append(stop_order)
+        timestamp = executed_trade['timestamp']
+        portion = params.get('portion_sell', 1.0)
+        expiry_time = self._calculate_expiry_time(timestamp, params)
         
-        # Create take profit order
-        if 'take_profit' in params and params['take_profit']:
-            tp_price = entry_price * (1 + params['take_profit'])
-            
-            tp_order = Order(
-                id=self._generate_order_id(),
-                symbol=symbol,
-                order_type=OrderType.TAKE_PROFIT,
-                quantity=quantity * params.get('portion_sell', 1.0),
-                timestamp_created=executed_trade['timestamp'],
-                trigger_price=tp_price,
-                params={'portion': params.get('portion_sell', 1.0)},
-                expiry_time=self._calculate_expiry_time(executed_trade['timestamp'], params)
-            )
-            self.open_orders.append(tp_order)
-            
-        # Create trailing stop order
-        if 'trailing_stop' in params and params['trailing_stop']:
-            trailing_order = Order(
+        # (order type, trigger price, trail percent) of each requested order, in creation order
+        order_specs = []
+        if params.get('stop_loss'):
+            order_specs.append((OrderType.STOP_LOSS, entry_price * (1 - params['stop_loss']), None))
+        if params.get('take_profit'):
+            order_specs.append((OrderType.TAKE_PROFIT, entry_price * (1 + params['take_profit']), None))
+        if params.get('trailing_stop'):
+            order_specs.append((OrderType.TRAILING_STOP, None, params['trailing_stop']))
+        
+        for order_type, trigger_price, trail_percent in order_specs:
+            order = Order(
                 id=self._generate_order_id(),
                 symbol=symbol,
-                order_type=OrderType.TRAILING_STOP,
-                quantity=quantity * params.get('portion_sell', 1.0),
-                timestamp_created=executed_trade['timestamp'],
-                trail_percent=params['trailing_stop'],
-                highest_price=entry_price,
-                params={'portion': params.get('portion_sell', 1.0)},
-                expiry_time=self._calculate_expiry_time(executed_trade['timestamp'], params)
+                order_type=order_type,
+                quantity=quantity * portion,
+                timestamp_created=timestamp,
+                trigger_price=trigger_price,
+                trail_percent=trail_percent,
+                highest_price=entry_price if trail_percent is not None else None,
+                params={'portion': portion},
+                expiry_time=expiry_time
             )
-            self.open_orders.append(trailing_order)
+            self.open_orders.add(order, self._price_columns[symbol])
 
-    def _calculate_expiry_time(self, timestamp: pd.Timestamp, params: Dict) -> Optional[pd.Timestamp]:
-        """Calculate expiry time for an order based on duration parameter"""
+    def _calculate_expiry_time(self, timestamp: pd.Timestamp, params: Dict) -> Optional[int]:
+        """Calculate expiry time (int64 nanoseconds) for an order based on duration parameter"""
         if 'duration' in params and params['duration']:
-            return timestamp + pd.Timedelta(hours=params['duration'])
+            return int(np.datetime64(timestamp, 'ns').astype(np.int64)) + int(params['duration'] * NS_PER_HOUR)
         return None
 
     def process_pending_orders(self, timestamp: pd.Timestamp):
         """Process all pending orders at the given timestamp"""
-        orders_to_remove = []
+        if len(self.open_orders) == 0:
+            return
         
-        for order in self.open_orders:
-            if not order.is_active:
-                continue
-                
-            # Check if order has expired
-            if order.expiry_time and timestamp >= order.expiry_time:
-                order.is_active = False
-                orders_to_remove.append(order)
-                continue
-                
-            current_price = self._get_current_price(order.symbol, timestamp)
-            if current_price <= 0:
-                continue
-            
-            order_triggered = False
-            
-            if order.order_type == OrderType.STOP_LOSS:
-                if current_price <= order.trigger_price:
-                    order_triggered = True
-                    
-            elif order.order_type == OrderType.TAKE_PROFIT:
-                if current_price >= order.trigger_price:
-                    order_triggered = True
-                    
-            elif order.order_type == OrderType.TRAILING_STOP:
-                # Update highest price
-                if current_price > order.highest_price:
-                    order.highest_price = current_price
-                    # Update trigger price
-                    order.trigger_price = order.highest_price * (1 - order.trail_percent)
-                
-                # Check if trailing stop triggered
-                if current_price <= order.trigger_price:
-                    order_triggered = True
+        prices = self._current_price_vector(timestamp)
+        now_ns = np.datetime64(timestamp, 'ns').astype(np.int64)
+        triggered = self.open_orders.scan(prices, now_ns)
+        
+        # Execute triggered orders as market sells, in creation order (each sell sees the previous ones)
+        symbols = list(self._price_columns)
+        arrays = self.open_orders.arrays
+        for i in triggered.tolist():
+            trade = {
+                'type': 'sell',
+                'symbol': symbols[arrays['column'][i]],
+                'timestamp': timestamp,
+                'params': self.open_orders.params[i],
+                'executed': False
+            }
             
-            if order_triggered:
-                # Execute the order as a market sell
-                trade = {
-                    'type': 'sell',
-                    'symbol': order.symbol,
-                    'timestamp': timestamp,
-                    'params': order.params,
-                    'executed': False
-                }
+            result = self._execute_sell_order(trade)
+            if result['executed']:
+                result['order_type'] = ORDER_TYPES[arrays['order_type'][i]].value
+                result['triggered_by'] = self.open_orders.ids[i]
+                self.trades.append(result)
                 
-                result = self._execute_sell_order(trade)
-                if result['executed']:
-                    result['order_type'] = order.order_type.value
-                    result['triggered_by'] = order.id
-                    self.trades.append(result)
-                    
-                order.is_active = False
-                orders_to_remove.append(order)
+            arrays['active'][i] = False
         
-        # Remove inactive orders
-        for order in orders_to_remove:
-            if order in self.open_orders:
-                self.open_orders.remove(order)
+        # Reclaim inactive slots when they dominate the book
+        self.open_orders.compact()
+
+    def _current_price_vector(self, timestamp: pd.Timestamp) -> np.ndarray:
+        """Close price of every market data symbol at timestamp, in column order"""
+        if self._bar_prices is not None:
+            return self._bar_prices
+        return np.array([self._get_current_price(symbol, timestamp) for symbol in self._price_columns], dtype=np.float64)
 
-    def update_graph_data(self, timestamp: pd.Timestamp):
-        """Update portfolio graph data and process pending orders"""
+    def update_graph_data(self, timestamp: Union[pd.Timestamp, np.datetime64]):
+        """Record the bar for the graph data and process pending orders (accepts raw datetime64 bars)"""
         # Process pending orders first
         self.process_pending_orders(timestamp)
         
-        # Update graph data
-        self.graph_data['timestamp'].append(timestamp)
-        self.graph_data['total_value'].append(self._get_total_usd_value(timestamp))
-        self.graph_data['benchmark'].append(self._get_benchmark_value(timestamp))
+        # Grow the arrays if more bars arrive than were preallocated
+        i = self._graph_size
+        if i == len(self.graph_data['timestamp']):
+            for key, values in self.graph_data.items():
+                grown = np.empty((max(2 * i, 64),) + values.shape[1:], dtype=values.dtype)
+                grown[:i] = values
+                self.graph_data[key] = grown
+
+        # Record the bar's state; values are computed for all bars at once in get_graph_data
+        self.graph_data['timestamp'][i] = timestamp
+        self.graph_data['cash'][i] = self.cash
+        np.maximum(self.positions, 0.0, out=self.graph_data['positions'][i])
+        if self._bar_prices is not None:
+            self.graph_data['prices'][i] = self._bar_prices
+        else:
+            self.graph_data['prices'][i] = [self._get_current_price(symbol, timestamp) for symbol in self._price_columns]
+        self._graph_size = i + 1
+
+    def step(self, timestamp: Union[pd.Timestamp, np.datetime64], signals: List[Dict], price_vector: np.ndarray):
+        """Advance one bar: pending orders, graph point, then the bar's signals, all priced from price_vector
+
+        price_vector holds the close of every symbol at this bar, in market data order
+        (a row of MarketBundle.close_matrix).
+        """
+        self._bar_prices = price_vector
+        try:
+            # Mark to market before the bar's own signals, as update_graph_data does standalone
+            self.update_graph_data(timestamp)
+
+            if signals:
+                self.execute_trades(signals, price_vector)
+        finally:
+            self._bar_prices = None
 
     def get_summary(self) -> Dict:
         """Return a summary of the portfolio"""
         if not self.market_data:
             return {}
             
-        active_positions = {k: v for k, v in self.positions.items() if v > 0}
-        
+        # Open positions are valued at the last bar of the data
+        values = self.positions * self._final_prices
+        active_positions = {}
         position_values = {}
-        total_position_value = 0
-        for symbol, quantity in active_positions.items():
-            if symbol in self.current_prices:
-                value = quantity * self.current_prices[symbol]
-                position_values[symbol] = value
-                total_position_value += value
+        for symbol, col in self._price_columns.items():
+            if self.positions[col] > 0:
+                active_positions[symbol] = float(self.positions[col])
+                position_values[symbol] = float(values[col])
+        total_position_value = sum(position_values.values())
         
-        # Calculate performance metrics
-        final_timestamp = max(data.index[-1] for data in self.market_data.values())
-        final_value = self._get_total_usd_value(final_timestamp)
+        # Calculate performance metrics at the last bar of the data
+        final_value = self.cash + total_position_value
         total_return = (final_value - self.initial_capital) / self.initial_capital
         
-        benchmark_final = self._get_benchmark_value(final_timestamp)
+        benchmark_quantities = self._benchmark_quantities()
+        benchmark_final = float(benchmark_quantities @ self._final_prices)
         benchmark_return = (benchmark_final - self.initial_capital) / self.initial_capital
         
         return {
@@ -420,5 +562,5 @@ class Portfolio:
             'position_values': position_values,
             'total_trades': len(self.trades),
             'total_commission': self.total_commission,
-            'open_orders': len([o for o in self.open_orders if o.is_active])
+            'open_orders': self.open_orders.active_count()
         }
\ No newline at end of file
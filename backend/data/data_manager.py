@@ -1,19 +1,87 @@
 import os
 import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 import requests
 
+# Parquet storage needs pyarrow (optional - falls back to CSV if installation fails)
+try:
+    import pyarrow  # noqa: F401
+    PARQUET_AVAILABLE = True
+except ImportError:
+    PARQUET_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+# Binance request weight allowed per minute and per IP (a 1000-kline page costs 2)
+BINANCE_WEIGHT_LIMIT = 1200
+# Retries of a page answered with 429, and the longest Retry-After worth waiting for in a request
+MAX_RATE_LIMIT_RETRIES = 3
+MAX_RATE_LIMIT_WAIT = 120
+# Missing ranges fetched at the same time (all within the shared weight budget)
+MAX_FETCH_WORKERS = 4
+
 class DataManager:
     """
-    Historical data manager with CSV storage.
+    Historical data manager with Parquet storage (CSV if pyarrow is not installed).
     Retrieves data from Binance and stores it locally.
     """
     
     def __init__(self):
         self.data_dir = "backend/data/historical"
+        self.file_format = 'parquet' if PARQUET_AVAILABLE else 'csv'
+        # One HTTP session per thread (requests.Session is not thread-safe), so consecutive
+        # pages fetched by a thread reuse the same connection
+        self._thread_local = threading.local()
+        # The weight budget is per IP, so a pause applies to every thread: requests wait until _resume_at
+        self._rate_limit_lock = threading.Lock()
+        self._resume_at = 0.0
+        # End of an IP ban (418): no request is sent before then
+        self._banned_until = 0.0
         # Create the data directory if it doesn't exist
         os.makedirs(self.data_dir, exist_ok=True)
 
+    @property
+    def session(self) -> requests.Session:
+        """HTTP session of the calling thread"""
+        session = getattr(self._thread_local, 'session', None)
+        if session is None:
+            session = self._thread_local.session = requests.Session()
+        return session
+
+    def _load_local_data(self, symbol: str, timeframe: str) -> pd.DataFrame:
+        """Loads stored data (Parquet first, then a CSV file from older versions)."""
+        parquet_path = os.path.join(self.data_dir, f"{symbol}_{timeframe}.parquet")
+        csv_path = os.path.join(self.data_dir, f"{symbol}_{timeframe}.csv")
+        
+        if PARQUET_AVAILABLE and os.path.exists(parquet_path):
+            # Typed columns: timestamps come back as datetime64, no parsing needed
+            df = pd.read_parquet(parquet_path)
+        elif os.path.exists(csv_path):
+            df = pd.read_csv(csv_path)
+            if pd.api.types.is_integer_dtype(df['timestamp']):
+                # Epoch milliseconds: converted without string parsing
+                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+            else:
+                # Date strings written by older versions
+                df['timestamp'] = pd.to_datetime(df['timestamp']).dt.tz_localize(None)  # Remove timezone
+        else:
+            return pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        return df.sort_values('timestamp')
+
+    def _save_local_data(self, df: pd.DataFrame, symbol: str, timeframe: str):
+        """Stores data in the configured file format."""
+        filepath = os.path.join(self.data_dir, f"{symbol}_{timeframe}.{self.file_format}")
+        if self.file_format == 'parquet':
+            df.to_parquet(filepath, index=False, compression='snappy')
+        else:
+            # Timestamps are written as epoch milliseconds so loading skips date parsing
+            timestamps_ms = df['timestamp'].to_numpy(dtype='datetime64[ms]').astype(np.int64)
+            df.assign(timestamp=timestamps_ms).to_csv(filepath, index=False)
+
     def get_historical_data(self, symbol: str, start_date: pd.Timestamp, end_date: pd.Timestamp, timeframe: str) -> pd.DataFrame:
         """
         Retrieves historical OHLCV data for a given symbol and timeframe.
@@ -28,38 +96,39 @@ class DataManager:
             DataFrame with columns: timestamp, open, high, low, close, volume
         """
         
-        filename = f"{symbol}_{timeframe}.csv"
-        filepath = os.path.join(self.data_dir, filename)
-        
         # Normalize input dates (remove timezone if present)
         start_date = start_date.tz_localize(None) if start_date.tz is not None else start_date
         end_date = end_date.tz_localize(None) if end_date.tz is not None else end_date
         
         # Load existing data or create an empty DataFrame
-        if os.path.exists(filepath):
-            df = pd.read_csv(filepath)
-            df['timestamp'] = pd.to_datetime(df['timestamp']).dt.tz_localize(None)  # Remove timezone
-            df = df.sort_values('timestamp')
-        else:
-            df = pd.DataFrame(columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+        df = self._load_local_data(symbol, timeframe)
         
         # Check if we need to fetch missing data
         missing_ranges = self._find_missing_ranges(df, start_date, end_date, timeframe)
         
-        # Fetch missing data from Binance
-        for range_start, range_end in missing_ranges:
-            new_data = self._fetch_from_binance(symbol, range_start, range_end, timeframe)
-            print("New data fetched:", new_data)
+        # Fetch missing data from Binance (ranges fetched concurrently, then concatenated once)
+        chunks = [df] if not df.empty else []
+        if len(missing_ranges) > 1:
+            with ThreadPoolExecutor(max_workers=min(MAX_FETCH_WORKERS, len(missing_ranges))) as executor:
+                fetched = list(executor.map(
+                    lambda bounds: self._fetch_from_binance(symbol, bounds[0], bounds[1], timeframe), missing_ranges
+                ))
+        else:
+            fetched = [self._fetch_from_binance(symbol, start, end, timeframe) for start, end in missing_ranges]
+        for (range_start, range_end), new_data in zip(missing_ranges, fetched):
+            logger.debug("Fetched %d rows for %s from %s to %s", len(new_data), symbol, range_start, range_end)
             if not new_data.empty:
-                df = pd.concat([df, new_data], ignore_index=True)
-                print("Data concatenated:", df)
+                chunks.append(new_data)
             else:
                 raise ValueError(f"No data retrieved for {symbol} from {range_start} to {range_end}")
+        if missing_ranges:
+            df = pd.concat(chunks, ignore_index=True)
+            logger.debug("%s %s now holds %d rows", symbol, timeframe, len(df))
 
         # Clean and save
         if not df.empty:
             df = df.drop_duplicates(subset=['timestamp']).sort_values('timestamp')
-            df.to_csv(filepath, index=False)
+            self._save_local_data(df, symbol, timeframe)
         
         # Return only the data within the requested range
         return df[(df['timestamp'] >= start_date) & (df['timestamp'] <= end_date)].copy()
@@ -71,17 +140,17 @@ class DataManager:
         if df.empty:
             return [(start_date, end_date)]
         
+        timeframe_delta = pd.Timedelta(timeframe)
+        
         # Check before the first timestamp
         first_ts = df['timestamp'].min()
         if start_date < first_ts:
             # Correctly calculate the end of the missing range
-            timeframe_delta = pd.Timedelta(timeframe)
             missing_ranges.append((start_date, first_ts - timeframe_delta))
         
         # Check after the last timestamp
         last_ts = df['timestamp'].max()
         if end_date > last_ts:
-            timeframe_delta = pd.Timedelta(timeframe)
             missing_ranges.append((last_ts + timeframe_delta, end_date))
         
         # Check for gaps in the data
@@ -89,31 +158,54 @@ class DataManager:
         if len(df_in_range) > 1:
             expected_timestamps = pd.date_range(start=df_in_range['timestamp'].min(), 
                                               end=df_in_range['timestamp'].max(), 
-                                              freq=timeframe)
-            actual_timestamps = set(df_in_range['timestamp'])
+                                              freq=timeframe_delta)
+            expected_ns = expected_timestamps.as_unit('ns').asi8
+            actual_ns = pd.DatetimeIndex(df_in_range['timestamp']).as_unit('ns').asi8
+            missing = np.isin(expected_ns, actual_ns, invert=True).astype(np.int8)
             
-            gap_start = None
-            for ts in expected_timestamps:
-                if ts not in actual_timestamps:
-                    if gap_start is None:
-                        gap_start = ts
-                else:
-                    if gap_start is not None:
-                        timeframe_delta = pd.Timedelta(timeframe)
-                        missing_ranges.append((gap_start, ts - timeframe_delta))
-                        gap_start = None
-            
-            # Handle a gap that goes to the end
-            if gap_start is not None:
-                missing_ranges.append((gap_start, df_in_range['timestamp'].max()))
+            # Each run of missing bars becomes one (first missing, last missing) range
+            gap_starts = np.flatnonzero(np.diff(missing, prepend=0) == 1)
+            gap_ends = np.flatnonzero(np.diff(missing, append=0) == -1)
+            for start_idx, end_idx in zip(gap_starts, gap_ends):
+                missing_ranges.append((expected_timestamps[start_idx], expected_timestamps[end_idx]))
         
         return missing_ranges
 
+    def _pause_requests(self, seconds: float):
+        """Holds back every thread's Binance requests for the given number of seconds."""
+        with self._rate_limit_lock:
+            self._resume_at = max(self._resume_at, time.time() + seconds)
+
+    def _wait_for_rate_limit(self) -> bool:
+        """Sleeps until requests may resume, if a pause is in effect. Returns False during an IP ban."""
+        with self._rate_limit_lock:
+            now = time.time()
+            if self._banned_until > now:
+                return False
+            delay = self._resume_at - now
+        if delay > 0:
+            time.sleep(delay)
+        return True
+
+    @staticmethod
+    def _retry_after(response: requests.Response) -> float:
+        """Seconds to wait from the Retry-After header (60 if missing or not a number)."""
+        try:
+            return max(float(response.headers.get('Retry-After', 60)), 0.0)
+        except (TypeError, ValueError):
+            return 60.0
+
+    def _respect_rate_limit(self, response: requests.Response):
+        """Pauses until the next weight window when the last response shows the budget is nearly used."""
+        used_weight = int(response.headers.get('X-MBX-USED-WEIGHT-1M', 0))
+        if used_weight >= 0.9 * BINANCE_WEIGHT_LIMIT:
+            self._pause_requests(60 - time.time() % 60)
+
     def _fetch_from_binance(self, symbol: str, start_date: pd.Timestamp, end_date: pd.Timestamp, interval: str) -> pd.DataFrame:
         """Fetches data from the Binance API."""
         base_url = "https://api.binance.com/api/v3/klines"
         
-        print(f"Fetching data for {symbol} from {start_date} to {end_date} with interval {interval}")
+        logger.info("Fetching data for %s from %s to %s with interval %s", symbol, start_date, end_date, interval)
         start_ms = int(start_date.timestamp() * 1000)
         end_ms = int(end_date.timestamp() * 1000)
 
@@ -125,36 +217,59 @@ class DataManager:
             'limit': 1000
         }
         
-        all_data = []
+        raw_klines = []  # Raw Binance rows: [open time (ms), open, high, low, close, volume, ...]
+        retries = 0
         
         while start_ms < end_ms:
             params['startTime'] = start_ms
             
             try:
-                response = requests.get(base_url, params=params)
+                if not self._wait_for_rate_limit():
+                    logger.error("Binance IP ban in effect, not fetching %s", symbol)
+                    break
+                response = self.session.get(base_url, params=params, timeout=10)
+                if response.status_code == 418:
+                    # IP ban (can last hours): stop, and send nothing more until it is over
+                    with self._rate_limit_lock:
+                        self._banned_until = max(self._banned_until, time.time() + self._retry_after(response))
+                    logger.error("Binance IP ban (418) while fetching %s", symbol)
+                    break
+                if response.status_code == 429:
+                    # Rate limited: wait as long as Binance asks, then retry the same page a few times
+                    retry_after = self._retry_after(response)
+                    retries += 1
+                    if retries > MAX_RATE_LIMIT_RETRIES or retry_after > MAX_RATE_LIMIT_WAIT:
+                        logger.error("Binance rate limit (429) while fetching %s, giving up", symbol)
+                        break
+                    self._pause_requests(retry_after)
+                    continue
                 response.raise_for_status()
                 data = response.json()
                 
                 if not data:
                     break
                 
-                for kline in data:
-                    all_data.append({
-                        'timestamp': pd.to_datetime(kline[0], unit='ms').tz_localize(None),  # Remove timezone
-                        'open': float(kline[1]),
-                        'high': float(kline[2]),
-                        'low': float(kline[3]),
-                        'close': float(kline[4]),
-                        'volume': float(kline[5])
-                    })
+                raw_klines.extend(data)
                 
                 # Update the start timestamp for the next request
                 start_ms = data[-1][0] + 1
                 
-                if start_ms < end_ms:
-                    time.sleep(1)
+                self._respect_rate_limit(response)
             except requests.exceptions.RequestException as e:
-                print(f"Error while fetching data: {e}")
+                logger.error("Error while fetching data: %s", e)
                 break
 
-        return pd.DataFrame(all_data)
\ No newline at end of file
+        if not raw_klines:
+            return pd.DataFrame()
+        
+        # Build the frame column-wise from the raw rows (one conversion per column)
+        klines = np.asarray([kline[:6] for kline in raw_klines], dtype=object)
+        prices = klines[:, 1:6].astype(np.float64)
+        return pd.DataFrame({
+            'timestamp': pd.to_datetime(klines[:, 0].astype(np.int64), unit='ms'),  # naive UTC
+            'open': prices[:, 0],
+            'high': prices[:, 1],
+            'low': prices[:, 2],
+            'close': prices[:, 3],
+            'volume': prices[:, 4]
+        })
\ No newline at end of file
@@ -21,31 +21,23 @@ class DCA_strategy(Strategy):
         self.name = 'DCA_strategy'
         
     def generate_signals(self, market_data: pd.DataFrame) -> pd.DataFrame:
-        print(market_data)
-        signal_df = market_data.copy()
-        signal_df['signal'] = None
+        # Daily buys at midnight, replaced by the monthly buy on the 1st (first bar is skipped)
+        index = market_data.index
+        is_daily = (index.hour == 0) & (index.minute == 0)
+        is_daily[:1] = False
+        is_monthly = is_daily & (index.day == 1)
         
-        for i in range(1, len(signal_df)):
-            if signal_df.index[i].hour == 0 and signal_df.index[i].minute == 0:
-                # Daily buy signal
-                signal_df.at[signal_df.index[i], 'signal'] = {
-                    'type': 'buy',
-                    'params': {
-                        'usdc_value': self.params['daily_investment']
-                    },
-                }
-            
-            if signal_df.index[i].day == 1 and signal_df.index[i].hour == 0 and signal_df.index[i].minute == 0:
-                # Monthly buy signal
-                signal_df.at[signal_df.index[i], 'signal'] = {
-                    'type': 'buy',
-                    'params': {
-                        'usdc_value': self.params['monthly_investment']
-                    },
-                }
-        
-        # Filter non-null signals
-        return signal_df[signal_df['signal'].notnull()]
+        # Signals only, indexed by bar (the OHLCV columns are not carried over)
+        signals = [
+            {
+                'type': 'buy',
+                'params': {
+                    'usdc_value': self.params['monthly_investment'] if monthly else self.params['daily_investment']
+                },
+            }
+            for monthly in is_monthly[is_daily]
+        ]
+        return pd.DataFrame({'signal': signals}, index=index[is_daily])
 
     def get_strategy_info(self):
         """
@@ -10,11 +10,59 @@ import logging
 from .strategy import Strategy
 
 # Import technical indicators from our helpers
-from backend.utils.helpers import calculate_rsi, calculate_ema, calculate_sma, calculate_atr, calculate_macd
+from backend.utils.helpers import calculate_rsi, calculate_ema, calculate_sma, calculate_atr, series_fingerprint
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+def _ema_trend(close: pd.Series, fast_period: int, slow_period: int) -> dict:
+    """EMA-derived trend arrays, which only depend on the two EMA periods
+
+    Returns the side of the fast EMA relative to the slow one (+1 above, -1
+    below, 0 equal) for each bar and the previous bar, the relative EMA
+    spread and the strong momentum mask (price > slow EMA by 0.5%).
+    Meant to be called through cached_indicator, which gives each caller its own copy.
+    """
+    close_values = close.to_numpy(dtype=np.float64)
+    ema_fast = calculate_ema(close, fast_period).to_numpy(dtype=np.float64)
+    ema_slow = calculate_ema(close, slow_period).to_numpy(dtype=np.float64)
+
+    # Crosses are sign changes of the EMA gap between consecutive bars
+    ema_gap = ema_fast - ema_slow
+    ema_side = np.sign(ema_gap)
+    return {
+        'ema_side': ema_side,
+        'prev_ema_side': np.concatenate(([np.nan], ema_side[:-1])),
+        'ema_spread': ema_gap / ema_slow,
+        'strong_momentum': (close_values - ema_slow) / ema_slow > 0.005
+    }
+
+def _filter_signals(buy_candidate: np.ndarray, sell_candidate: np.ndarray, min_gap: int):
+    """Accept candidate bars at least min_gap bars apart, never repeating the previous signal type
+
+    Returns the accepted bar positions and whether each one is a buy. Only the
+    candidate positions are visited, since the rule depends on the previous
+    accepted signal.
+    """
+    accepted = []
+    is_buy = []
+    last_type = None
+    last_index = -10
+    for i in np.flatnonzero(buy_candidate | sell_candidate).tolist():
+        # Avoid signals too close together
+        if i - last_index < min_gap:
+            continue
+        if buy_candidate[i] and last_type != 'buy':
+            last_type = 'buy'
+        elif sell_candidate[i] and last_type != 'sell':
+            last_type = 'sell'
+        else:
+            continue
+        accepted.append(i)
+        is_buy.append(last_type == 'buy')
+        last_index = i
+    return np.array(accepted, dtype=np.int64), np.array(is_buy, dtype=bool)
+
 class EMACrossoverRSIVolumeStrategy(Strategy):
     """
     Strategy combining EMA Crossover, RSI, and Volume analysis
@@ -64,155 +112,130 @@ class EMACrossoverRSIVolumeStrategy(Strategy):
         if missing_columns:
             raise ValueError(f"Missing columns: {missing_columns}")
 
-        signal_df = market_data.copy()
-        signal_df['signal'] = None
-
-        # Indicator calculations
-        # EMAs
-        signal_df['ema_fast'] = calculate_ema(signal_df['close'], self.params['ema_fast'])
-        signal_df['ema_slow'] = calculate_ema(signal_df['close'], self.params['ema_slow'])
+        # Indicator calculations (cached across parameter sets), kept as raw arrays:
+        # every condition is evaluated for all bars at once
+        close_series = market_data['close']
+        close = close_series.to_numpy(dtype=np.float64)
+        # Each cached input is hashed once, however many indicators use it
+        close_fp = series_fingerprint(close_series)
+        high_fp = series_fingerprint(market_data['high'])
+        low_fp = series_fingerprint(market_data['low'])
+
+        # EMAs and their trend arrays (reused when only the other parameters change)
+        trend = self.cached_indicator(_ema_trend, close_series, fingerprints=(close_fp,),
+                                      fast_period=self.params['ema_fast'], slow_period=self.params['ema_slow'])
+        ema_side = trend['ema_side']
+        prev_ema_side = trend['prev_ema_side']
 
         # RSI
-        signal_df['rsi'] = calculate_rsi(signal_df['close'], self.params['rsi_period'])
+        rsi = self.cached_indicator(calculate_rsi, close_series, fingerprints=(close_fp,),
+                                    period=self.params['rsi_period']).to_numpy(dtype=np.float64)
 
         # ATR for dynamic stop loss and take profit
-        signal_df['atr'] = calculate_atr(signal_df['high'], signal_df['low'], 
-                                        signal_df['close'], self.params['atr_period'])
-
-        # Average volume
-        signal_df['volume_sma'] = calculate_sma(signal_df['volume'], self.params['volume_period'])
-        signal_df['volume_ratio'] = signal_df['volume'] / signal_df['volume_sma']
-
-        # MACD for trend confirmation
-        macd, macd_signal, macd_hist = calculate_macd(signal_df['close'])
-        signal_df['macd'] = macd
-        signal_df['macd_signal'] = macd_signal
-        signal_df['macd_hist'] = macd_hist
-
-        # Variables to avoid repetitive signals
-        last_signal_type = None
-        last_signal_index = -10
-
-        # Signal generation
-        for i in range(max(self.params['ema_slow'], self.params['volume_period'], self.params['atr_period']) + 1, len(signal_df)):
-            current_price = signal_df['close'].iloc[i]
-            prev_price = signal_df['close'].iloc[i-1]
-            current_atr = signal_df['atr'].iloc[i]
-
-            ema_fast_curr = signal_df['ema_fast'].iloc[i]
-            ema_slow_curr = signal_df['ema_slow'].iloc[i]
-            ema_fast_prev = signal_df['ema_fast'].iloc[i-1]
-            ema_slow_prev = signal_df['ema_slow'].iloc[i-1]
-
-            current_rsi = signal_df['rsi'].iloc[i]
-            volume_ratio = signal_df['volume_ratio'].iloc[i]
-            macd_hist_curr = signal_df['macd_hist'].iloc[i]
-
-            # Bull market detection (relaxed conditions)
-            ema_spread = (ema_fast_curr - ema_slow_curr) / ema_slow_curr
-            bull_market_condition = (ema_spread > 0.008 and  # Fast EMA > Slow EMA by 0.8%
-                                   current_rsi < 90)  # Less restrictive RSI
-
-            # Strong momentum detection
-            price_above_ema = (current_price - ema_slow_curr) / ema_slow_curr
-            strong_momentum = (price_above_ema > 0.005)  # Price > Slow EMA by 0.5%
-
-            # Adaptive volume conditions
-            if bull_market_condition and strong_momentum:
-                required_volume = self.params['volume_spike']  # Higher volume required
-                rsi_buy_threshold = min(75, self.params['rsi_buy_max'] + 15)  # More permissive RSI
-                rsi_sell_threshold = max(25, self.params['rsi_sell_min'] - 15)  # More restrictive RSI for sell
-            else:
-                required_volume = self.params['volume_multiplier']
-                rsi_buy_threshold = self.params['rsi_buy_max']
-                rsi_sell_threshold = self.params['rsi_sell_min']
-
-            # Conditions for SELL signal
-            ema_bearish_cross = (ema_fast_prev >= ema_slow_prev and ema_fast_curr < ema_slow_curr)
-            ema_bearish_trend = ema_fast_curr < ema_slow_curr
-            rsi_sell_condition = current_rsi > rsi_sell_threshold and current_rsi < 75
-            macd_bearish = macd_hist_curr < 0
-            price_decline = current_price < prev_price
-
-            # Avoid signals too close together
-            if i - last_signal_index < 3:
-                continue
-
-            # Conditions for BUY signal
-            ema_bullish_cross = (ema_fast_prev <= ema_slow_prev and ema_fast_curr > ema_slow_curr)
-            ema_bullish_trend = ema_fast_curr > ema_slow_curr
-            rsi_buy_condition = current_rsi < rsi_buy_threshold and current_rsi > 25
-            volume_condition = volume_ratio > required_volume
-            macd_bullish = macd_hist_curr > 0
-            price_momentum = current_price > prev_price
-
-            # Buy signal: EMA crossover or confirmed bullish trend
-            if ((ema_bullish_cross or (ema_bullish_trend and price_momentum)) and
-                rsi_buy_condition and volume_condition and
-                last_signal_type != 'buy'):
-
-                # Adaptive take profit and duration based on market conditions
-                if bull_market_condition and strong_momentum:
-                    # Bull market: wider TP and longer duration
-                    atr_take_profit = (current_atr * self.params['atr_tp_bull_multiplier']) / current_price
-                    trade_duration = self.params['duration_bull']
-                else:
-                    # Normal market
-                    atr_take_profit = (current_atr * self.params['atr_tp_multiplier']) / current_price
-                    trade_duration = self.params['duration']
-
-                # Standard stop loss in all cases
-                atr_stop_loss = (current_atr * self.params['atr_sl_multiplier']) / current_price
-
-                signal_df.at[signal_df.index[i], 'signal'] = {
+        atr = self.cached_indicator(calculate_atr, market_data['high'], market_data['low'], close_series,
+                                    fingerprints=(high_fp, low_fp, close_fp),
+                                    period=self.params['atr_period']).to_numpy(dtype=np.float64)
+
+        # Average volume (a moving average costs less than hashing its input, so it is not cached)
+        volume_sma = calculate_sma(market_data['volume'], self.params['volume_period'])
+        volume_ratio = (market_data['volume'] / volume_sma).to_numpy(dtype=np.float64)
+
+        # Previous bar values (NaN on the first bar, so no condition holds there)
+        prev_close = np.concatenate(([np.nan], close[:-1]))
+
+        # Bull market detection (relaxed conditions)
+        bull_market_condition = (trend['ema_spread'] > 0.008) & (rsi < 90)  # Fast EMA > Slow EMA by 0.8%, less restrictive RSI
+
+        # Strong momentum detection (price > slow EMA by 0.5%)
+        strong_momentum = trend['strong_momentum']
+
+        # Adaptive volume and RSI conditions (higher volume, more permissive buy RSI, more restrictive sell RSI)
+        bull_and_strong = bull_market_condition & strong_momentum
+        required_volume = np.where(bull_and_strong, self.params['volume_spike'], self.params['volume_multiplier'])
+        rsi_buy_threshold = np.where(bull_and_strong, min(75, self.params['rsi_buy_max'] + 15), self.params['rsi_buy_max'])
+        rsi_sell_threshold = np.where(bull_and_strong, max(25, self.params['rsi_sell_min'] - 15), self.params['rsi_sell_min'])
+
+        volume_condition = volume_ratio > required_volume
+
+        # Conditions for BUY signal: EMA crossover or confirmed bullish trend
+        ema_bullish_trend = ema_side > 0
+        ema_bullish_cross = (prev_ema_side <= 0) & ema_bullish_trend
+        rsi_buy_condition = (rsi < rsi_buy_threshold) & (rsi > 25)
+        price_momentum = close > prev_close
+        buy_candidate = ((ema_bullish_cross | (ema_bullish_trend & price_momentum)) &
+                         rsi_buy_condition & volume_condition)
+
+        # Conditions for SELL signal: bearish EMA crossover or confirmed bearish trend
+        ema_bearish_trend = ema_side < 0
+        ema_bearish_cross = (prev_ema_side >= 0) & ema_bearish_trend
+        rsi_sell_condition = (rsi > rsi_sell_threshold) & (rsi < 75)
+        price_decline = close < prev_close
+        sell_candidate = ((ema_bearish_cross | (ema_bearish_trend & price_decline)) &
+                          rsi_sell_condition & volume_condition)
+
+        # Indicators need a warm-up period before any signal
+        warmup = max(self.params['ema_slow'], self.params['volume_period'], self.params['atr_period']) + 1
+        buy_candidate[:warmup] = False
+        sell_candidate[:warmup] = False
+
+        # No candidate at all (common in parameter sweeps): skip the filtering and frame building
+        if not (buy_candidate.any() or sell_candidate.any()):
+            logger.info("Signals generated - Total: 0, Buys: 0, Sells: 0")
+            return pd.DataFrame({'signal': np.empty(0, dtype=object)}, index=market_data.index[:0])
+
+        # Spacing / alternation rules, then signal dicts only for the accepted bars
+        accepted, accepted_is_buy = _filter_signals(buy_candidate, sell_candidate, 3)
+
+        # Stop loss and take profit based on ATR, for all accepted bars at once
+        # (bull market buys get a wider TP, the stop loss is standard in all cases)
+        accepted_close = close[accepted]
+        accepted_atr = atr[accepted]
+        accepted_bull = bull_and_strong[accepted] & accepted_is_buy
+        tp_multiplier = np.where(accepted_bull, self.params['atr_tp_bull_multiplier'], self.params['atr_tp_multiplier'])
+        stop_losses = (accepted_atr * self.params['atr_sl_multiplier']) / accepted_close
+        take_profits = (accepted_atr * tp_multiplier) / accepted_close
+
+        # Fixed trailing part of each kind of signal (bull market buys also last longer)
+        bull_buy_tail = {'duration': self.params['duration_bull'], 'close_anyway': False}
+        normal_tail = {'duration': self.params['duration'], 'close_anyway': False}
+
+        signals = {}
+        for i, is_buy, is_bull, stop_loss, take_profit in zip(accepted.tolist(), accepted_is_buy.tolist(),
+                                                              accepted_bull.tolist(), stop_losses.tolist(),
+                                                              take_profits.tolist()):
+            if is_buy:
+                signals[i] = {
                     'type': 'buy',
                     'params': {
                         'portion': self.params['portion_buy'],
-                        'stop_loss': atr_stop_loss,
-                        'take_profit': atr_take_profit,
-                        'duration': trade_duration,
-                        'close_anyway': False,
-                        'bull_market': bool(bull_market_condition)  # Info for backtesting
+                        'stop_loss': stop_loss,
+                        'take_profit': take_profit,
+                        **(bull_buy_tail if is_bull else normal_tail),
+                        'bull_market': bool(bull_market_condition[i])  # Info for backtesting
                     },
                 }
-                last_signal_type = 'buy'
-                last_signal_index = i
-
-            # Sell signal: bearish EMA crossover or confirmed bearish trend
-            elif ((ema_bearish_cross or (ema_bearish_trend and price_decline)) and
-                  rsi_sell_condition and volume_condition and
-                  last_signal_type != 'sell'):
-
-                # Stop loss and take profit based on ATR
-                atr_stop_loss = (current_atr * self.params['atr_sl_multiplier']) / current_price
-                atr_take_profit = (current_atr * self.params['atr_tp_multiplier']) / current_price
-
-                signal_df.at[signal_df.index[i], 'signal'] = {
+            else:
+                signals[i] = {
                     'type': 'sell',
                     'params': {
                         'portion': self.params['portion_sell'],
-                        'stop_loss': atr_stop_loss,
-                        'take_profit': atr_take_profit,
-                        'duration': self.params['duration'],
-                        'close_anyway': False
+                        'stop_loss': stop_loss,
+                        'take_profit': take_profit,
+                        **normal_tail
                     },
                 }
-                last_signal_type = 'sell'
-                last_signal_index = i
-
-        # Cleanup and statistics
-        signals_only = signal_df[signal_df['signal'].notnull()].drop(columns=[
-            'ema_fast', 'ema_slow', 'rsi', 'atr', 'volume_sma', 'volume_ratio',
-            'macd', 'macd_signal', 'macd_hist'
-        ])
-
-        buy_signals = len([s for s in signals_only['signal'] if s['type'] == 'buy'])
-        sell_signals = len([s for s in signals_only['signal'] if s['type'] == 'sell'])
-        bull_market_signals = len([s for s in signals_only['signal']
-                                 if s['type'] == 'buy' and s.get('params', {}).get('bull_market', False)])
-
-        logger.info(f"Signals generated - Total: {len(signals_only)}, Buys: {buy_signals}, Sells: {sell_signals}")
-        logger.info(f"Bull market signals: {bull_market_signals} ({bull_market_signals/max(buy_signals,1)*100:.1f}% of buys)")
+
+        # Signal-only frame at the accepted bars, and statistics
+        signals_only = pd.DataFrame({'signal': list(signals.values())}, index=market_data.index[list(signals)])
+
+        # Counts straight from the accepted-bar masks
+        buy_signals = int(np.count_nonzero(accepted_is_buy))
+        sell_signals = len(accepted) - buy_signals
+        bull_market_signals = int(np.count_nonzero(bull_market_condition[accepted] & accepted_is_buy))
+
+        logger.info("Signals generated - Total: %d, Buys: %d, Sells: %d", len(signals_only), buy_signals, sell_signals)
+        logger.info("Bull market signals: %d (%.1f%% of buys)",
+                    bull_market_signals, bull_market_signals / max(buy_signals, 1) * 100)
 
         return signals_only
 
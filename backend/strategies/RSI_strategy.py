@@ -45,42 +45,40 @@ class RSIStrategy(Strategy):
         if 'close' not in market_data.columns:
             raise ValueError("Market data must contain a 'close' column")
             
-        signal_df = market_data.copy()
-        signal_df['signal'] = None
+        # Calculate RSI using our helper function (cached across parameter sets)
+        rsi = self.cached_indicator(calculate_rsi, market_data['close'], period=self.params['rsi_period']).to_numpy(dtype=np.float64)
         
-        # Calculate RSI using our helper function
-        signal_df['rsi'] = calculate_rsi(signal_df['close'], period=self.params['rsi_period'])
+        # Buy signal: RSI is below the oversold threshold
+        # Sell signal: RSI is above the overbought threshold (a bar matching both is a buy)
+        is_buy = rsi <= self.params['rsi_oversold']
+        is_sell = ~is_buy & (rsi >= self.params['rsi_overbought'])
+        is_buy[:1] = False  # No signal on the first bar
+        is_sell[:1] = False
         
-        # Generate signals
-        for i in range(1, len(signal_df)):
-            current_rsi = signal_df['rsi'].iloc[i]
+        # Signal dicts are read-only downstream, so every buy / sell row shares one dict
+        buy_signal = {
+            'type': 'buy',
+            'params': {
+                'portion': self.params['portion_buy'],
+                'stop_loss': self.params['stop_loss'],
+                'duration': self.params['duration'],
+                'close_anyway': False
+            },
+        }
+        sell_signal = {
+            'type': 'sell',
+            'params': {
+                'portion': self.params['portion_sell'],
+                'stop_loss': self.params['stop_loss'],
+                'duration': self.params['duration'],
+                'close_anyway': False
+            },
+        }
 
-            # Buy signal: RSI is below the oversold threshold
-            if current_rsi <= self.params['rsi_oversold']:
-                signal_df.at[signal_df.index[i], 'signal'] = {
-                    'type': 'buy',
-                    'params': {
-                        'portion': self.params['portion_buy'],
-                        'stop_loss': self.params['stop_loss'],
-                        'duration': self.params['duration'],
-                        'close_anyway': False
-                    },
-                }
-            
-            # Sell signal: RSI is above the overbought threshold
-            elif current_rsi >= self.params['rsi_overbought']:
-                signal_df.at[signal_df.index[i], 'signal'] = {
-                    'type': 'sell',
-                    'params': {
-                        'portion': self.params['portion_sell'],
-                        'stop_loss': self.params['stop_loss'],
-                        'duration': self.params['duration'],
-                        'close_anyway': False
-                    },
-                }
-
-        # Filter non-null signals
-        signals_only = signal_df[signal_df['signal'].notnull()].drop(columns=['rsi'])
+        # Signal-only frame in bar order
+        has_signal = is_buy | is_sell
+        signals = np.where(is_buy[has_signal], buy_signal, sell_signal)
+        signals_only = pd.DataFrame({'signal': signals}, index=market_data.index[has_signal])
         logger.info(f"Total number of signals generated: {len(signals_only)}")
         
         return signals_only
@@ -23,11 +23,8 @@ class BuyAndHoldStrategy(Strategy):
         self.name = 'buy_and_hold'
 
     def generate_signals(self, market_data: pd.DataFrame) -> pd.DataFrame:
-        signal_df = market_data.copy()
-        signal_df['signal'] = None
-
         # Buy signal at the first point
-        signal_df.at[signal_df.index[0], 'signal'] = {
+        buy_signal = {
             'type': 'buy',
             'params': {
                 'portion': self.params['portion_buy']
@@ -35,17 +32,17 @@ class BuyAndHoldStrategy(Strategy):
         }
         
         # Sell signal at the last point
-        signal_df.at[signal_df.index[-1], 'signal'] = {
+        sell_signal = {
             'type': 'sell',
             'params': {
                 'portion': self.params['portion_sell']
                 },
         }
 
-        # Filter non-null signals
-        signals_only = signal_df[signal_df['signal'].notnull()]
-
-        return signals_only
+        # Signal-only frame (a single bar keeps only the sell, as before)
+        if len(market_data) == 1:
+            return pd.DataFrame({'signal': [sell_signal]}, index=market_data.index)
+        return pd.DataFrame({'signal': [buy_signal, sell_signal]}, index=market_data.index[[0, -1]])
     
     def get_strategy_info(self):
         """
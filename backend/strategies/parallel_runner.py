@@ -0,0 +1,60 @@
+"""
+Parallel signal generation over assets and parameter sets
+"""
+
+import os
+import logging
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Optional, Tuple, Type
+import pandas as pd
+from .strategy import Strategy
+
+logger = logging.getLogger(__name__)
+
+# Market data of the current worker process, sent once when the worker starts
+_WORKER_MARKET_DATA: Dict[str, pd.DataFrame] = {}
+
+def _init_worker(market_data_by_asset: Dict[str, pd.DataFrame]):
+    """Stores the market data in the worker so tasks only carry an asset name and parameters"""
+    global _WORKER_MARKET_DATA
+    _WORKER_MARKET_DATA = market_data_by_asset
+
+def _worker(strategy_cls: Type[Strategy], asset: str, params: Dict) -> pd.DataFrame:
+    """Generates the signals of one (asset, parameter set) pair"""
+    strategy = strategy_cls()
+    strategy.set_params(params)
+    return strategy.generate_signals(_WORKER_MARKET_DATA[asset])
+
+def run_grid(strategy_cls: Type[Strategy], market_data_by_asset: Dict[str, pd.DataFrame],
+             param_grid: List[Dict], max_workers: Optional[int] = None) -> Dict[Tuple[str, int], pd.DataFrame]:
+    """
+    Generates signals for every asset and parameter set across CPU cores
+
+    Each worker receives the market data once, at startup; tasks then only
+    send the asset name and parameter set. Within a worker, indicators shared
+    by several parameter sets come from the strategy indicator cache.
+
+    Args:
+        strategy_cls: Strategy class to instantiate for each task
+        market_data_by_asset: {asset: market data DataFrame}
+        param_grid: List of strategy parameter dictionaries
+        max_workers: Number of worker processes (default: CPU count)
+
+    Returns:
+        {(asset, index in param_grid): signals DataFrame}; failed tasks are logged and left out
+    """
+    results = {}
+    with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count(),
+                             initializer=_init_worker, initargs=(market_data_by_asset,)) as executor:
+        futures = {
+            executor.submit(_worker, strategy_cls, asset, params): (asset, index)
+            for asset in market_data_by_asset
+            for index, params in enumerate(param_grid)
+        }
+        for future in as_completed(futures):
+            asset, index = futures[future]
+            try:
+                results[(asset, index)] = future.result()
+            except Exception as e:
+                logger.warning("Failed to generate signals for %s with parameter set %d: %s", asset, index, e)
+    return results
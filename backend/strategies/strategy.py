@@ -8,7 +8,7 @@ import numpy as np
 import logging
 
 # Import technical indicators from our helpers
-from backend.utils.helpers import calculate_rsi, calculate_ema, calculate_sma, calculate_atr, calculate_macd
+from backend.utils.helpers import calculate_rsi, calculate_ema, calculate_sma, calculate_atr, calculate_macd, cached_indicator
 
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -39,14 +39,33 @@ class Strategy(ABC):
         # {'name': 'risk_param_name', 'display_name': 'Risk Parameter Display Name', 'default': default_value}
     ]
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Parameter names and defaults (strategy and risk parameters), resolved once per class
+        declared = list(cls.parameters) + list(cls.risk_parameters)
+        cls._param_names = frozenset(p['name'] for p in declared)
+        cls._defaults = {p['name']: p['default'] for p in declared}
+
     def __init__(self):
         self.name = 'example_strategy'
 
+    @staticmethod
+    def cached_indicator(fn, *series: pd.Series, fingerprints=None, **kwargs):
+        """
+        Calls an indicator helper, reusing the result of an earlier call on identical inputs
+
+        Parameter sweeps re-run strategies on the same market data, so e.g. the RSI
+        for a given period is only computed once. Each call returns its own copy
+        of the result. Pass fingerprints (series_fingerprint of each input) when
+        several cached indicators share an input, so it is hashed only once.
+        """
+        return cached_indicator(fn, *series, fingerprints=fingerprints, **kwargs)
+
     def set_params(self, params):
-        use_defaults = not all(k['name'] in params for k in self.parameters) or not all(k['name'] in params for k in self.risk_parameters)
+        use_defaults = not self._param_names.issubset(params)
         if use_defaults:
             logger.info("Using default parameters for example_strategy")
-        self.params = {p['name']: p['default'] for p in self.parameters} if use_defaults else params
+        self.params = dict(self._defaults) if use_defaults else params
         
     def validate_params(self, params):
         """
@@ -5,22 +5,29 @@ Helper utilities for the trading bot
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-from typing import Union, List, Dict, Any, Optional
-import json
+from typing import Union, List, Dict, Any, Optional, Callable, Iterator, Mapping
+from collections import OrderedDict
+from functools import lru_cache
+from types import MappingProxyType
+import hashlib
+import threading
+import orjson
 
 def round_to_precision(value: float, precision: int = 8) -> float:
     """Round value to specified precision"""
     return round(value, precision)
 
+# Powers of ten for the usual precisions, so truncation does not exponentiate per call
+POWERS_OF_TEN = tuple(10 ** i for i in range(19))
+
 def truncate_to_precision(value: float, precision: int = 8) -> float:
     """Truncate value to specified precision"""
-    multiplier = 10 ** precision
+    multiplier = POWERS_OF_TEN[precision] if 0 <= precision < len(POWERS_OF_TEN) else 10 ** precision
     return int(value * multiplier) / multiplier
 
-def get_symbol_precision(symbol: str) -> Dict[str, int]:
-    """Get default precision for symbol (price and quantity)"""
-    # Default precisions for common symbols
-    precisions = {
+# Default precisions for common symbols (read-only; get_symbol_precision returns copies)
+SYMBOL_PRECISIONS = MappingProxyType({
+    symbol: MappingProxyType(precision) for symbol, precision in {
         'BTCUSDT': {'price': 2, 'quantity': 6},
         'ETHUSDT': {'price': 2, 'quantity': 5},
         'ADAUSDT': {'price': 4, 'quantity': 1},
@@ -28,38 +35,48 @@ def get_symbol_precision(symbol: str) -> Dict[str, int]:
         'SOLUSDT': {'price': 2, 'quantity': 3},
         'XRPUSDT': {'price': 4, 'quantity': 1},
         'DOGEUSDT': {'price': 5, 'quantity': 0},
-    }
-    
-    return precisions.get(symbol.upper(), {'price': 4, 'quantity': 3})
+    }.items()
+})
+DEFAULT_SYMBOL_PRECISION = MappingProxyType({'price': 4, 'quantity': 3})
+
+@lru_cache(maxsize=256)
+def _symbol_precision(symbol: str) -> Mapping[str, int]:
+    """Shared read-only precision entry of a symbol, for the formatting helpers"""
+    return SYMBOL_PRECISIONS.get(symbol.upper(), DEFAULT_SYMBOL_PRECISION)
+
+def get_symbol_precision(symbol: str) -> Dict[str, int]:
+    """Get default precision for symbol (price and quantity)"""
+    return dict(_symbol_precision(symbol))
 
 def format_trade_amount(amount: float, symbol: str) -> float:
     """Format trade amount according to symbol precision"""
-    precision = get_symbol_precision(symbol)
+    precision = _symbol_precision(symbol)
     return round_to_precision(amount, precision['quantity'])
 
 def format_price(price: float, symbol: str) -> float:
     """Format price according to symbol precision"""
-    precision = get_symbol_precision(symbol)
+    precision = _symbol_precision(symbol)
     return round_to_precision(price, precision['price'])
 
+# Minutes per timeframe
+TIMEFRAME_MINUTES = MappingProxyType({
+    '1m': 1,
+    '5m': 5,
+    '15m': 15,
+    '30m': 30,
+    '1h': 60,
+    '4h': 240,
+    '1d': 1440,
+    '1w': 10080,
+    '1M': 43200,  # Approximate
+})
+
 def convert_timeframe_to_minutes(timeframe: str) -> int:
     """Convert timeframe string to minutes"""
-    timeframe_map = {
-        '1m': 1,
-        '5m': 5,
-        '15m': 15,
-        '30m': 30,
-        '1h': 60,
-        '4h': 240,
-        '1d': 1440,
-        '1w': 10080,
-        '1M': 43200,  # Approximate
-    }
-    
-    return timeframe_map.get(timeframe, 60)  # Default to 1 hour
+    return TIMEFRAME_MINUTES.get(timeframe, 60)  # Default to 1 hour
 
-def serialize_for_json(obj: Any) -> Any:
-    """Serialize object for JSON output"""
+def _serialize_by_isinstance(obj: Any) -> Any:
+    """Serialize objects whose exact type has no entry in _JSON_SERIALIZERS (e.g. np.int32, subclasses)"""
     if isinstance(obj, (pd.Timestamp, datetime)):
         return obj.isoformat()
     elif isinstance(obj, np.integer):
@@ -75,51 +92,86 @@ def serialize_for_json(obj: Any) -> Any:
     else:
         return obj
 
+def _identity(obj: Any) -> Any:
+    return obj
+
+# Exact type -> serializer: one dict lookup for the common types instead of the isinstance chain
+_JSON_SERIALIZERS: Mapping[type, Callable[[Any], Any]] = MappingProxyType({
+    pd.Timestamp: pd.Timestamp.isoformat,
+    datetime: datetime.isoformat,
+    np.int64: int,
+    np.float64: float,
+    np.ndarray: np.ndarray.tolist,
+    pd.DataFrame: lambda df: df.to_dict('records'),
+    pd.Series: pd.Series.tolist,
+    str: _identity,
+    int: _identity,
+    float: _identity,
+    bool: _identity,
+    type(None): _identity,
+})
+
+def serialize_for_json(obj: Any) -> Any:
+    """Serialize object for JSON output"""
+    return _JSON_SERIALIZERS.get(type(obj), _serialize_by_isinstance)(obj)
+
 def deep_serialize_dict(data: Dict[str, Any]) -> Dict[str, Any]:
-    """Deep serialize dictionary for JSON"""
+    """Deep serialize dictionary for JSON (nested dicts and lists, including dicts inside lists)"""
     result = {}
-    for key, value in data.items():
-        if isinstance(value, dict):
-            result[key] = deep_serialize_dict(value)
-        elif isinstance(value, list):
-            result[key] = [serialize_for_json(item) for item in value]
-        else:
-            result[key] = serialize_for_json(value)
+    # Explicit stack of (source container, output container) pairs instead of recursion
+    stack = [(data, result)]
+    while stack:
+        source, target = stack.pop()
+        items = source.items() if isinstance(source, dict) else enumerate(source)
+        for key, value in items:
+            if isinstance(value, dict):
+                target[key] = {}
+                stack.append((value, target[key]))
+            elif isinstance(value, list):
+                target[key] = [None] * len(value)
+                stack.append((value, target[key]))
+            else:
+                target[key] = serialize_for_json(value)
     
     return result
 
 def load_config_file(file_path: str) -> Dict[str, Any]:
     """Load configuration from JSON file"""
     try:
-        with open(file_path, 'r') as f:
-            return json.load(f)
+        with open(file_path, 'rb') as f:
+            return orjson.loads(f.read())
     except FileNotFoundError:
         return {}
-    except json.JSONDecodeError:
+    except orjson.JSONDecodeError:
         return {}
 
 def save_config_file(data: Dict[str, Any], file_path: str) -> bool:
     """Save configuration to JSON file"""
     try:
-        with open(file_path, 'w') as f:
-            json.dump(data, f, indent=2, default=serialize_for_json)
+        # NumPy scalars and arrays are encoded natively; serialize_for_json only handles the rest
+        body = orjson.dumps(data, default=serialize_for_json,
+                            option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS)
+        with open(file_path, 'wb') as f:
+            f.write(body)
         return True
     except Exception:
         return False
 
 def merge_dicts(dict1: Dict[str, Any], dict2: Dict[str, Any]) -> Dict[str, Any]:
     """Merge two dictionaries, with dict2 taking precedence"""
-    result = dict1.copy()
-    result.update(dict2)
-    return result
+    return {**dict1, **dict2}
+
+@lru_cache(maxsize=1024)
+def _split_key_path(key_path: str) -> tuple:
+    """Split a dot-notation key path once per distinct path"""
+    return tuple(key_path.split('.'))
 
 def get_nested_value(data: Dict[str, Any], key_path: str, default: Any = None) -> Any:
     """Get nested value from dictionary using dot notation"""
-    keys = key_path.split('.')
     current = data
     
     try:
-        for key in keys:
+        for key in _split_key_path(key_path):
             current = current[key]
         return current
     except (KeyError, TypeError):
@@ -127,15 +179,20 @@ def get_nested_value(data: Dict[str, Any], key_path: str, default: Any = None) -
 
 def set_nested_value(data: Dict[str, Any], key_path: str, value: Any) -> None:
     """Set nested value in dictionary using dot notation"""
-    keys = key_path.split('.')
+    *parents, last = _split_key_path(key_path)
     current = data
     
-    for key in keys[:-1]:
-        if key not in current:
-            current[key] = {}
-        current = current[key]
+    for key in parents:
+        current = current.setdefault(key, {})
     
-    current[keys[-1]] = value
+    current[last] = value
+
+def iter_chunks(seq: Any, chunk_size: int) -> Iterator[Any]:
+    """Yield successive chunks of specified size (NumPy arrays and bytes are sliced without copying)"""
+    if isinstance(seq, (bytes, bytearray)):
+        seq = memoryview(seq)
+    for i in range(0, len(seq), chunk_size):
+        yield seq[i:i + chunk_size]
 
 def chunks(lst: List[Any], chunk_size: int) -> List[List[Any]]:
     """Split list into chunks of specified size"""
@@ -143,37 +200,90 @@ def chunks(lst: List[Any], chunk_size: int) -> List[List[Any]]:
 
 def flatten_list(nested_list: List[List[Any]]) -> List[Any]:
     """Flatten nested list"""
+    # Explicit stack instead of recursion: no call per level and no recursion limit
     result = []
-    for item in nested_list:
-        if isinstance(item, list):
-            result.extend(flatten_list(item))
-        else:
+    stack = [iter(nested_list)]
+    while stack:
+        for item in stack[-1]:
+            if isinstance(item, list):
+                stack.append(iter(item))
+                break
             result.append(item)
+        else:
+            stack.pop()
     return result
 
 def remove_duplicates(lst: List[Any], preserve_order: bool = True) -> List[Any]:
     """Remove duplicates from list"""
     if preserve_order:
-        seen = set()
-        result = []
-        for item in lst:
-            if item not in seen:
-                seen.add(item)
-                result.append(item)
-        return result
+        # dict keys keep insertion order, so this is an order-preserving dedupe done in C
+        return list(dict.fromkeys(lst))
     else:
         return list(set(lst))
 
 def calculate_compound_return(returns: List[float]) -> float:
-    """Calculate compound return from a series of returns"""
-    if not returns:
+    """Calculate compound return from a series of returns (in percent)"""
+    rates = np.asarray(returns, dtype=np.float64) / 100
+    if rates.size == 0:
         return 0.0
     
-    compound = 1.0
-    for ret in returns:
-        compound *= (1 + ret / 100)
+    if (rates > -1).all():
+        # Sum of log growth factors: one vector pass, and stable for many small returns
+        return float(np.expm1(np.log1p(rates).sum()) * 100)
+    # A loss of 100% or more has no logarithm: multiply the growth factors directly
+    return float((np.prod(1 + rates) - 1) * 100)
+
+# Indicator cache: results keyed by (indicator function, input contents, keyword arguments), evicted oldest first.
+# Request threads share it, so lookups and inserts hold _INDICATOR_CACHE_LOCK
+_INDICATOR_CACHE: OrderedDict = OrderedDict()
+_INDICATOR_CACHE_SIZE = 256
+_INDICATOR_CACHE_LOCK = threading.Lock()
+
+def series_fingerprint(series: pd.Series) -> bytes:
+    """Digest of a series' values and index, equal for identical inputs (costs about one cheap indicator)"""
+    row_hashes = pd.util.hash_pandas_object(series, index=True).to_numpy()
+    return hashlib.blake2b(row_hashes.tobytes(), digest_size=16).digest()
+
+def _copy_result(result: Any) -> Any:
+    """Copy of a cached indicator result (pandas/NumPy objects, or dicts and tuples of them)"""
+    if isinstance(result, dict):
+        return {key: _copy_result(value) for key, value in result.items()}
+    if isinstance(result, tuple):
+        return tuple(_copy_result(value) for value in result)
+    if isinstance(result, (pd.Series, pd.DataFrame, np.ndarray)):
+        return result.copy()
+    return result
+
+def cached_indicator(fn: Callable, *series: pd.Series, fingerprints: Optional[tuple] = None, **kwargs) -> Any:
+    """
+    Call an indicator function, reusing the result of an earlier call on identical inputs
+    
+    Hashing the inputs costs about as much as a moving average, so only cache
+    indicators that are clearly more expensive, and pass the fingerprints of
+    series used by several cached calls instead of having each call rehash them.
+    
+    Args:
+        fn: Indicator function taking the series positionally
+        *series: Input series
+        fingerprints: series_fingerprint of each input series, if the caller already has them
+        **kwargs: Indicator parameters (pass them by keyword so equal calls share an entry)
     
-    return (compound - 1) * 100
+    Returns:
+        A copy of the indicator result (callers may modify it without affecting the cache)
+    """
+    # Keyed on the function object itself, so same-named indicators never share entries
+    if fingerprints is None:
+        fingerprints = tuple(series_fingerprint(s) for s in series)
+    key = (fn, tuple(fingerprints), tuple(sorted(kwargs.items())))
+    with _INDICATOR_CACHE_LOCK:
+        result = _INDICATOR_CACHE.get(key)
+    if result is None:
+        result = fn(*series, **kwargs)
+        with _INDICATOR_CACHE_LOCK:
+            _INDICATOR_CACHE[key] = result
+            if len(_INDICATOR_CACHE) > _INDICATOR_CACHE_SIZE:
+                _INDICATOR_CACHE.popitem(last=False)
+    return _copy_result(result)
 
 # Technical Indicators (Simple implementations without TA-Lib)
 def calculate_rsi(prices: pd.Series, period: int = 14) -> pd.Series:
@@ -254,15 +364,16 @@ def calculate_atr(high: pd.Series, low: pd.Series, close: pd.Series, period: int
     Returns:
         Series with ATR values
     """
-    prev_close = close.shift(1)
-    
-    tr1 = high - low
-    tr2 = abs(high - prev_close)
-    tr3 = abs(low - prev_close)
+    high_values = high.to_numpy(dtype=np.float64)
+    low_values = low.to_numpy(dtype=np.float64)
+    prev_close = np.concatenate(([np.nan], close.to_numpy(dtype=np.float64)[:-1]))
     
-    tr = pd.concat([tr1, tr2, tr3], axis=1).max(axis=1)
+    # True range in place on one buffer (fmax skips the missing previous close on the first bar)
+    tr = np.abs(high_values - prev_close)
+    np.fmax(tr, np.abs(low_values - prev_close), out=tr)
+    np.fmax(tr, high_values - low_values, out=tr)
     
-    return tr.rolling(window=period).mean()
+    return pd.Series(tr, index=close.index).rolling(window=period).mean()
 
 def calculate_macd(prices: pd.Series, fast_period: int = 12, slow_period: int = 26, signal_period: int = 9) -> tuple:
     """
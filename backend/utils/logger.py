@@ -2,11 +2,18 @@
 Logging utilities for the trading bot
 """
 
+import atexit
 import logging
+import logging.handlers
+import queue
 import sys
 from datetime import datetime
 import os
 
+# Size cap of each log file and number of rotated files kept
+LOG_FILE_MAX_BYTES = 10 * 1024 * 1024
+LOG_FILE_BACKUP_COUNT = 5
+
 def setup_logger(name, level=logging.INFO, log_file=None):
     """Setup logger with basic configuration"""
     logger = logging.getLogger(name)
@@ -22,17 +29,27 @@ def setup_logger(name, level=logging.INFO, log_file=None):
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     console_handler.setFormatter(console_formatter)
-    logger.addHandler(console_handler)
+    handlers = [console_handler]
     
-    # File handler (optional)
+    # File handler (optional), rotated to bound disk usage
     if log_file:
         os.makedirs(os.path.dirname(log_file), exist_ok=True)
-        file_handler = logging.FileHandler(log_file)
+        file_handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=LOG_FILE_MAX_BYTES, backupCount=LOG_FILE_BACKUP_COUNT
+        )
         file_formatter = logging.Formatter(
             '%(asctime)s - %(name)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
         )
         file_handler.setFormatter(file_formatter)
-        logger.addHandler(file_handler)
+        handlers.append(file_handler)
+    
+    # The calling thread only enqueues records; a background listener does the console/file I/O
+    log_queue = queue.Queue(-1)
+    logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    # Flush pending records on interpreter exit
+    atexit.register(listener.stop)
     
     return logger
 
@@ -42,12 +59,12 @@ def get_logger(name):
 
 def log_trade(logger, action, symbol, amount, price, reason=""):
     """Log trading action in standardized format"""
-    logger.info(f"TRADE: {action} {amount} {symbol} @ {price} - {reason}")
+    logger.info("TRADE: %s %s %s @ %s - %s", action, amount, symbol, price, reason)
 
 def log_error(logger, error, context=""):
     """Log error with context information"""
-    logger.error(f"ERROR: {error} - Context: {context}")
+    logger.error("ERROR: %s - Context: %s", error, context)
 
 def log_performance(logger, metrics):
     """Log performance metrics"""
-    logger.info(f"PERFORMANCE: {metrics}")
\ No newline at end of file
+    logger.info("PERFORMANCE: %s", metrics)
\ No newline at end of file
@@ -7,26 +7,34 @@ from datetime import datetime, timedelta
 import pandas as pd
 from typing import Union, List, Dict, Any
 
+# Quote currencies of valid crypto pairs: BTCUSDT, BTCUSDC, ETHBTC, BTCEUR, etc.
+QUOTE_CURRENCIES = ('USDT', 'USDC', 'BTC', 'EUR')
+
+# Supported timeframes
+VALID_TIMEFRAMES = frozenset(['1m', '5m', '15m', '30m', '1h', '4h', '1d', '1w', '1M'])
+
+# Characters stripped by sanitize_string (str.translate deletion table)
+DANGEROUS_CHARS_TABLE = str.maketrans('', '', '<>"\'')
+
+# Patterns compiled once at import
+API_KEY_PATTERN = re.compile(r'^[A-Za-z0-9]+$')
+
 def validate_symbol(symbol: str) -> bool:
     """Validate trading symbol format"""
     if not symbol or not isinstance(symbol, str):
         return False
     
-    # Basic validation for crypto pairs
+    # Basic validation for crypto pairs: 2 to 10 letters followed by a known quote currency
     symbol = symbol.upper()
-    valid_patterns = [
-        r'^[A-Z]{2,10}USDT$',  # BTCUSDT, ETHUSDT, etc.
-        r'^[A-Z]{2,10}USDC$',  # BTCUSDC, ETHUSDC, etc.
-        r'^[A-Z]{2,10}BTC$',   # ETHBTC, etc.
-        r'^[A-Z]{2,10}EUR$',   # BTCEUR, etc.
-    ]
-    
-    return any(bool(re.match(pattern, symbol)) for pattern in valid_patterns)
+    for quote in QUOTE_CURRENCIES:
+        if symbol.endswith(quote):
+            base = symbol[:-len(quote)]
+            return 2 <= len(base) <= 10 and base.isascii() and base.isalpha()
+    return False
 
 def validate_timeframe(timeframe: str) -> bool:
     """Validate timeframe format"""
-    valid_timeframes = ['1m', '5m', '15m', '30m', '1h', '4h', '1d', '1w', '1M']
-    return timeframe in valid_timeframes
+    return isinstance(timeframe, str) and timeframe in VALID_TIMEFRAMES
 
 def validate_date(date_input: Union[str, datetime, pd.Timestamp]) -> bool:
     """Validate date input"""
@@ -63,13 +71,10 @@ def sanitize_string(input_str: str, max_length: int = 100) -> str:
         return ""
     
     # Remove dangerous characters
-    sanitized = re.sub(r'[<>"\']', '', input_str)
+    sanitized = input_str.translate(DANGEROUS_CHARS_TABLE)
     
     # Limit length
-    if len(sanitized) > max_length:
-        sanitized = sanitized[:max_length]
-    
-    return sanitized.strip()
+    return sanitized[:max_length].strip()
 
 def validate_api_key(api_key: str) -> bool:
     """Validate API key format"""
@@ -81,4 +86,4 @@ def validate_api_key(api_key: str) -> bool:
         return False
     
     # Should contain only alphanumeric characters
-    return bool(re.match(r'^[A-Za-z0-9]+$', api_key))
\ No newline at end of file
+    return API_KEY_PATTERN.match(api_key) is not None
\ No newline at end of file
@@ -0,0 +1,22 @@
+"""
+Gunicorn configuration for serving the trading bot in production
+
+Usage: gunicorn -c gunicorn.conf.py "backend.app:create_app()"
+"""
+
+import multiprocessing
+import os
+
+bind = f"{os.getenv('FLASK_HOST', '0.0.0.0')}:{os.getenv('FLASK_PORT', '5000')}"
+
+# Threaded workers: backtests are CPU-bound in NumPy/pandas, so one process per core
+# (gevent would only add overhead) with a second thread to overlap response I/O
+worker_class = 'gthread'
+workers = multiprocessing.cpu_count()
+threads = 2
+
+# Import the app (and its parsed config) once in the master; workers share it copy-on-write
+preload_app = True
+
+# Backtests over long windows can take a while before the first byte is sent
+timeout = 120
@@ -9,20 +9,28 @@ from backend.app import create_app
 
 def main():
     """Main entry point"""
+    # Production: hand the process over to Gunicorn (multi-worker WSGI server, see gunicorn.conf.py)
+    if os.getenv('ENVIRONMENT') == 'production':
+        print("🚀 Launching the Crypto Trading Bot with Gunicorn...")
+        os.execvp(sys.executable, [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py',
+                                   'backend.app:create_app()'])
+    
     # Create the Flask application
     app = create_app()
     
     # Local development configuration
     if __name__ == "__main__":
+        host = os.getenv('FLASK_HOST', '0.0.0.0')
+        port = int(os.getenv('FLASK_PORT', '5000'))
         print("🚀 Launching the Crypto Trading Bot...")
-        print("📊 Backtest interface available at: http://localhost:5000")
+        print(f"📊 Backtest interface available at: http://localhost:{port}")
         print("⚠️  Development mode - Local use only")
         
         # Start the Flask server
         app.run(
-            host='0.0.0.0',
-            port=5000,
-            debug=True,
+            host=host,
+            port=port,
+            debug=app.config['DEBUG'],
             threaded=True
         )
 